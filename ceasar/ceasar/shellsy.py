@@ -4,7 +4,7 @@ from random import choice
 
 
 class shellsy(Shell):  # creating the subshell!
-    @Command
+    @Command(cpu_bound=True)
     def ceasar(
         shell,
         text: str,
@@ -24,7 +24,7 @@ class shellsy(Shell):  # creating the subshell!
 
         return ceasar.ceasar_text(text, offset, not (Nil - nonletters))
 
-    @ceasar.dispatch  # A second function for files
+    @ceasar.dispatch(cpu_bound=False)  # A second function for files
     def ceasar2(
         shell,
         infile: Path,
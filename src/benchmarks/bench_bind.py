@@ -0,0 +1,42 @@
+"""
+Times `CommandParameters.bind` for commands of 0, 5 and 50 parameters,
+bound half positionally and half by keyword.
+
+run with `python benchmarks/bench_bind.py [calls]` from `src/`.
+"""
+
+import sys
+import timeit
+
+from shellsy.shell import CommandParameters
+from shellsy.shell import S_Arguments
+
+
+def make_function(count: int):
+    params = "".join(f", p{i}: int" for i in range(count))
+    namespace = {}
+    exec(f"def command(shell{params}): pass", namespace)
+    return namespace["command"]
+
+
+def make_arguments(count: int) -> S_Arguments:
+    half = count // 2
+    args = [(i, (i, str(i))) for i in range(half)]
+    kwargs = {(f"p{i}", i): (i, (i, str(i))) for i in range(half, count)}
+    return S_Arguments(args, kwargs, "")
+
+
+def main(calls: int = 10000, repeat: int = 5):
+    print(f"{calls} calls, best of {repeat}")
+    for count in (0, 5, 50):
+        params = CommandParameters.from_function(make_function(count))
+        args = make_arguments(count)
+        times = timeit.repeat(
+            lambda: params.bind(args), number=calls, repeat=repeat
+        )
+        best = min(times)
+        print(f"{count:>3} parameters: {best / calls * 1e6:9.2f} us/call")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
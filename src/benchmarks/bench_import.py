@@ -0,0 +1,38 @@
+"""
+Times the creation of a plugin shell class holding many documented
+commands, as done when the plugin module is imported.
+
+run with `python benchmarks/bench_import.py [commands]` from `src/`.
+"""
+
+import sys
+import timeit
+
+TEMPLATE = '''
+    @Command
+    def command{i}(shell, text: str, count: int = 1, path: Path = None):
+        """
+        Does the thing number {i} to text
+        :param text: The text to work on
+        :param count: How many times to do it
+        :param path: An optional file to write the result to
+
+        :returns: The resulting text
+        """
+        return text * count
+'''
+
+
+def make_plugin(count: int) -> str:
+    source = "from shellsy.shell import *\n\n\nclass shellsy(Shell):"
+    return source + "".join(TEMPLATE.format(i=i) for i in range(count))
+
+
+def main(count: int = 500, repeat: int = 5):
+    code = compile(make_plugin(count), "<plugin>", "exec")
+    best = min(timeit.repeat(lambda: exec(code, {}), number=1, repeat=repeat))
+    print(f"{count} commands, best of {repeat}: {best * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
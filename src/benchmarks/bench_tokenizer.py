@@ -0,0 +1,47 @@
+"""
+Compares the character scanning `_Parser` with the regex based
+`_Tokenizer` over long generated argument lines.
+
+run with `python benchmarks/bench_tokenizer.py [literals]` from `src/`.
+"""
+
+import sys
+import timeit
+
+from shellsy.lang import _Parser
+from shellsy.lang import _Tokenizer
+
+SAMPLES = ("12", "-3.25", "'some text'", "word", "1:10:2", "/a/path/", "$var")
+
+
+def make_line(count: int) -> str:
+    return " ".join(SAMPLES[i % len(SAMPLES)] for i in range(count))
+
+
+def parser_scan(line: str):
+    literals = []
+    pos = 0
+    while pos < len(line):
+        lit, idx = _Parser.next_key(line, pos)
+        if lit is None:
+            lit, idx = _Parser.next_literal(line, pos)
+        literals.append(lit)
+        pos = idx
+    return literals
+
+
+def tokenizer_scan(line: str):
+    return [token.text for token in _Tokenizer.tokenize(line)]
+
+
+def main(count: int = 5000, repeat: int = 5):
+    line = make_line(count)
+    print(f"{count} literals, {len(line)} characters, best of {repeat}")
+    scans = (("_Parser", parser_scan), ("_Tokenizer", tokenizer_scan))
+    for name, func in scans:
+        best = min(timeit.repeat(lambda: func(line), number=1, repeat=repeat))
+        print(f"{name:>12}: {best * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -20,8 +20,45 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
-from .repl import S_Repl
+import argparse
 
 
-def main():
-    S_Repl().cmdloop()
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="shellsy")
+    commands = parser.add_subparsers(dest="command")
+    run = commands.add_parser("run", help="run a shellsy script")
+    run.add_argument("script", help="the script file to run")
+    run.add_argument(
+        "-k",
+        "--keep-going",
+        action="store_true",
+        help="continue running after a failed line",
+    )
+    run.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="do not use the compiled scripts cache",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        from .runner import S_Runner, ScriptCache
+        from .settings import data_dir, get_setting, init
+
+        init()
+        cache = None
+        if not args.no_cache:
+            cache = ScriptCache(
+                data_dir / "cache" / "scripts",
+                get_setting("script_cache_size", 64 * 1024 * 1024),
+            )
+        runner = S_Runner(keep_going=args.keep_going, cache=cache)
+        return 1 if runner.run_file(args.script) else 0
+    else:
+        from .repl import S_Repl
+
+        S_Repl().cmdloop()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,404 @@
+"""
+Shellsy: An extensible shell program designed for ease of use and flexibility.
+
+This module holds the caching helpers used around the interpreter.
+
+Copyright (C) 2024 ken-morel
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import hashlib
+import marshal
+import os
+import pickle
+import tempfile
+import time
+
+from collections import OrderedDict
+from collections.abc import Iterator
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Hashable
+from typing import Optional
+
+from . import __version__
+from .lang import NilType
+
+
+class LRUCache:
+    """
+    A bounded mapping which evicts the least recently used entries, and
+    optionally entries older than a time to live, and counts it's hits and
+    misses.
+    """
+
+    _MISSING = object()
+    maxsize: int
+    ttl: Optional[float]
+    hits: int
+    misses: int
+
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None):
+        """
+        :param maxsize: The maximum number of entries kept, `0` disables
+        caching
+        :param ttl: The number of seconds entries are kept, `None` keeps
+        them until evicted
+        """
+        self._data = OrderedDict()
+        self._maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, size: int):
+        self._maxsize = size
+        self._evict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Gets the value stored at key, marking it as recently used.
+
+        :param key: The key to look for
+        :param default: The value returned on misses
+
+        :returns: The cached value or default
+        """
+        val = self._data.get(key, self._MISSING)
+        if val is self._MISSING:
+            self.misses += 1
+            return default
+        if self.ttl is not None:
+            expires, val = val
+            if expires < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return val
+
+    def set(self, key: Hashable, val: Any):
+        """
+        Stores val at key, evicting the oldest entries if needed.
+        """
+        if self._maxsize <= 0:
+            return
+        if self.ttl is not None:
+            val = (time.monotonic() + self.ttl, val)
+        self._data[key] = val
+        self._data.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        while len(self._data) > max(self._maxsize, 0):
+            self._data.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all entries and resets the counters.
+        """
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    def info(self) -> dict[str, int]:
+        """
+        :returns: a dictionary with the `hits`, `misses`, `size` and
+        `maxsize` of the cache
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self._maxsize,
+        }
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+
+_SINGLETONS = (type(None), type(Ellipsis), NilType)
+
+
+def canonical_key(val: Any) -> Hashable:
+    """
+    Converts val into a hashable key, equal for equal values of the same
+    types, lists, dictionnaries and other literals which are not hashable
+    are converted recursively, relative paths are made absolute.
+
+    :param val: The value to convert
+    :returns: The key
+
+    :raises TypeError: val can't be converted, as iterators which can't be
+    compared without consuming them, or objects hashed by identity, as
+    variables, which value may change between calls
+    """
+    cls = type(val)
+    if cls in (list, tuple):
+        return (cls, tuple(map(canonical_key, val)))
+    elif cls is dict:
+        items = ((canonical_key(k), canonical_key(v)) for k, v in val.items())
+        return (cls, frozenset(items))
+    elif cls in (set, frozenset):
+        return (cls, frozenset(map(canonical_key, val)))
+    elif cls is slice:
+        return (cls, canonical_key((val.start, val.stop, val.step)))
+    elif isinstance(val, Path):
+        return (Path, str(val.absolute()))
+    elif isinstance(val, Iterator):
+        raise TypeError(f"can't make a key of iterator {val!r}")
+    elif cls.__hash__ is object.__hash__ and cls not in _SINGLETONS:
+        raise TypeError(f"can't make a key of {cls.__name__} objects")
+    hash(val)
+    return (cls, val)
+
+
+class DiskCache:
+    """
+    A directory of files keyed by hex digests, bounded in total size by
+    evicting the least recently used files. Writes are atomic, so
+    concurrent runs never read a partial entry.
+    """
+
+    path: Path
+    max_bytes: int
+
+    def __init__(self, path: Path, max_bytes: int = 64 * 1024 * 1024):
+        """
+        :param path: The cache directory, created on first write
+        :param max_bytes: The maximum total size of the entries
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+
+    def _file(self, key: str) -> Path:
+        return self.path / key
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Reads the entry stored at key, marking it as recently used.
+
+        :param key: The entry key, a hex digest
+        :returns: The entry content, or None if not cached
+        """
+        file = self._file(key)
+        try:
+            data = file.read_bytes()
+        except OSError:
+            return None
+        try:
+            os.utime(file)
+        except OSError:
+            pass
+        return data
+
+    def set(self, key: str, data: bytes):
+        """
+        Atomically writes data at key, then evicts old entries past
+        `max_bytes`.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._file(key))
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        self.evict()
+
+    def delete(self, key: str):
+        try:
+            os.unlink(self._file(key))
+        except OSError:
+            pass
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in
+        `max_bytes`.
+        """
+        entries = []
+        total = 0
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if entry.name.startswith(".tmp-") or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        """
+        Removes every entry.
+        """
+        if not self.path.exists():
+            return
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if entry.is_file():
+                    try:
+                        os.unlink(entry.path)
+                    except OSError:
+                        pass
+
+
+class ResultCache:
+    """
+    Stores pickled command results on disk, keyed by the command path and
+    code and a digest of it's bound arguments, which for paths includes the
+    file size and modification time, and optionally it's content hash.
+    """
+
+    SCALARS = (str, int, float, Decimal, bytes, bool, type(None), NilType)
+    disk: DiskCache
+
+    def __init__(self, path: Path, max_bytes: int = 256 * 1024 * 1024):
+        """
+        :param path: The cache directory
+        :param max_bytes: The maximum total size of the stored results
+        """
+        self.disk = DiskCache(path, max_bytes)
+
+    def key(
+        self,
+        path: str,
+        func: Callable,
+        kwargs: dict[str, Any],
+        hash_files: bool = False,
+    ) -> str:
+        """
+        :param path: The command path in the shell, as `shell.command`
+        :param func: The command function
+        :param kwargs: The bound arguments
+        :param hash_files: Hash the content of path arguments
+
+        :returns: The hex digest keying the result, which changes with the
+        whole function code, constants included, and the shellsy version
+
+        :raises TypeError: An argument has no stable digest
+        """
+        digest = hashlib.sha256()
+        digest.update(path.encode() + b"\0" + __version__.encode())
+        digest.update(marshal.dumps(func.__code__))
+        self._feed(digest, kwargs, hash_files)
+        return digest.hexdigest()
+
+    def _feed(self, digest, val: Any, hash_files: bool):
+        cls = type(val)
+        digest.update(b"\0" + cls.__qualname__.encode() + b":")
+        if cls in (list, tuple):
+            digest.update(str(len(val)).encode())
+            for item in val:
+                self._feed(digest, item, hash_files)
+        elif cls in (dict, set, frozenset):
+            items = val.items() if cls is dict else ((x,) for x in val)
+            parts = []
+            for item in items:
+                part = hashlib.sha256()
+                self._feed(part, item, hash_files)
+                parts.append(part.digest())
+            for part in sorted(parts):
+                digest.update(part)
+        elif cls is slice:
+            self._feed(digest, (val.start, val.stop, val.step), hash_files)
+        elif isinstance(val, Path):
+            path = val.absolute()
+            digest.update(str(path).encode())
+            try:
+                stat = path.stat()
+            except OSError:
+                digest.update(b"missing")
+                return
+            digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+            if hash_files and path.is_file():
+                content = hashlib.sha256()
+                with open(path, "rb") as f:
+                    while chunk := f.read(1 << 16):
+                        content.update(chunk)
+                digest.update(content.digest())
+        elif isinstance(val, self.SCALARS):
+            digest.update(repr(val).encode())
+        else:
+            raise TypeError(f"no stable digest for {cls.__qualname__}")
+
+    def load(self, key: str) -> Any:
+        """
+        :returns: The result stored at key, or None
+        """
+        if (data := self.disk.get(key)) is None:
+            return None
+        try:
+            return pickle.loads(data)
+        except Exception:
+            self.disk.delete(key)
+            return None
+
+    def store(self, key: str, val: Any):
+        """
+        Stores val at key, `None`, which reads as a miss, and values which
+        can't be pickled are not stored.
+        """
+        if val is None:
+            return
+        try:
+            data = pickle.dumps(val, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        self.disk.set(key, data)
+
+
+_result_cache = None
+
+
+def result_cache() -> ResultCache:
+    """
+    Gets the result cache of persisted commands, stored in the shellsy data
+    directory and bounded by the `result_cache_size` setting.
+    """
+    global _result_cache
+    if _result_cache is None:
+        from .settings import data_dir, get_setting
+
+        _result_cache = ResultCache(
+            data_dir / "cache" / "results",
+            get_setting("result_cache_size", 256 * 1024 * 1024),
+        )
+    return _result_cache
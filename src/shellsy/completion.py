@@ -0,0 +1,266 @@
+"""
+Shellsy: An extensible shell program designed for ease of use and flexibility.
+
+This module indexes command names for prefix and fuzzy completion.
+
+Copyright (C) 2024 ken-morel
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import heapq
+import os
+import threading
+
+from bisect import bisect_left
+from collections.abc import Iterable
+from typing import Optional
+
+from .cache import LRUCache
+
+
+class _Node:
+    __slots__ = ("children", "names")
+
+    def __init__(self):
+        self.children = {}
+        self.names = set()
+
+
+class CompletionIndex:
+    """
+    Indexes names in a prefix trie, each node holding the names below it,
+    and by character for fuzzy, subsequence matches. Prefix matches rank
+    first, shortest first, then subsequence matches by how compact they
+    are.
+    """
+
+    names: set[str]
+    generation: Optional[int]
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.names = set()
+        self.generation = None
+        self._root = _Node()
+        self._chars = {}
+        self._last = None
+        self.update(names)
+
+    def add(self, name: str):
+        """
+        Indexes name, if not already.
+        """
+        if name in self.names:
+            return
+        self.names.add(name)
+        node = self._root
+        node.names.add(name)
+        for char in name:
+            node = node.children.setdefault(char, _Node())
+            node.names.add(name)
+        for char in set(name):
+            self._chars.setdefault(char, set()).add(name)
+        self._last = None
+
+    def discard(self, name: str):
+        """
+        Removes name from the index, if there.
+        """
+        if name not in self.names:
+            return
+        self.names.discard(name)
+        node = self._root
+        node.names.discard(name)
+        for char in name:
+            child = node.children[char]
+            child.names.discard(name)
+            if not child.names:
+                del node.children[char]
+                break
+            node = child
+        for char in set(name):
+            self._chars[char].discard(name)
+            if not self._chars[char]:
+                del self._chars[char]
+        self._last = None
+
+    def update(self, names: Iterable[str]):
+        """
+        Makes the index hold exactly names, adding and removing only the
+        names which changed.
+        """
+        names = set(names)
+        for name in self.names - names:
+            self.discard(name)
+        for name in names - self.names:
+            self.add(name)
+
+    def refresh(self, shellsy) -> bool:
+        """
+        Reindexes the command paths of shellsy if it's `generation` changed
+        since the last refresh, entry points are named by their shell.
+
+        :returns: If the index was updated
+        """
+        if self.generation == shellsy.generation:
+            return False
+        self.update(
+            name.removesuffix(".__entrypoint__")
+            for name in shellsy.command_paths
+            if name != "__entrypoint__"
+        )
+        self.generation = shellsy.generation
+        return True
+
+    def prefixed(self, prefix: str) -> frozenset[str]:
+        """
+        :returns: The indexed names starting with prefix
+        """
+        return frozenset(self._prefixed(prefix))
+
+    def _prefixed(self, prefix: str) -> set[str]:
+        # the trie node set itself, not to be mutated
+        node = self._root
+        for char in prefix:
+            if (node := node.children.get(char)) is None:
+                return set()
+        return node.names
+
+    def subsequences(self, query: str) -> set[str]:
+        """
+        :returns: The indexed names holding the characters of query in
+        order, narrowed from the previous query results when query extends
+        it.
+        """
+        if self._last is not None and query.startswith(self._last[0]):
+            candidates = self._last[1]
+        else:
+            try:
+                sets = sorted((self._chars[c] for c in set(query)), key=len)
+            except KeyError:
+                sets = [set()]
+            if sets:
+                candidates = sets[0].intersection(*sets[1:])
+            else:
+                candidates = self.names
+        matches = {
+            name for name in candidates if _span(query, name) is not None
+        }
+        self._last = (query, matches)
+        return matches
+
+    def complete(self, query: str, limit: int = 50) -> list[str]:
+        """
+        :param query: The text typed
+        :param limit: The maximum number of names returned
+
+        :returns: The best limit names matching query, best first
+        """
+        prefixed = self._prefixed(query)
+        best = heapq.nsmallest(limit, prefixed, key=lambda n: (len(n), n))
+        if len(best) < limit:
+            fuzzy = self.subsequences(query) - prefixed
+            best.extend(
+                heapq.nsmallest(
+                    limit - len(best),
+                    fuzzy,
+                    key=lambda n: (_span(query, n), len(n), n),
+                )
+            )
+        return best
+
+
+class DirectoryCache:
+    """
+    Caches the sorted `os.scandir` listings of directories, keyed by their
+    absolute path and dropped when the directory mtime changes.
+    """
+
+    max_scored: int = 5000
+
+    def __init__(self, maxsize: int = 64):
+        """
+        :param maxsize: The number of directory listings kept
+        """
+        self.cache = LRUCache(maxsize)
+        self._lock = threading.Lock()
+
+    def listing(self, path: str) -> list[tuple[str, bool]]:
+        """
+        :param path: The directory to list
+
+        :returns: The sorted `(name, is_dir)` entries of path
+        :raises OSError: If path could not be listed
+        """
+        path = os.path.abspath(path)
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            cached = self.cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        entries = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                entries.append((entry.name, is_dir))
+        entries.sort()
+        with self._lock:
+            self.cache.set(path, (mtime, entries))
+        return entries
+
+    def complete(
+        self, path: str, query: str, limit: int = 50
+    ) -> list[tuple[str, bool]]:
+        """
+        Completes query to entries of the directory path, the entries
+        starting with query first, found by bisection, then at most
+        `max_scored` other entries are matched as subsequences.
+
+        :returns: The best limit `(name, is_dir)` entries
+        :raises OSError: If path could not be listed
+        """
+        entries = self.listing(path)
+        start = bisect_left(entries, (query,))
+        best = []
+        for entry in entries[start : start + limit]:
+            if not entry[0].startswith(query):
+                break
+            best.append(entry)
+        if len(best) < limit and query:
+            scored = (
+                (span, entry)
+                for entry in entries[: self.max_scored]
+                if not entry[0].startswith(query)
+                and (span := _span(query, entry[0])) is not None
+            )
+            best.extend(
+                entry
+                for _, entry in heapq.nsmallest(limit - len(best), scored)
+            )
+        return best
+
+
+def _span(query: str, name: str) -> Optional[int]:
+    # length of the leftmost match of query characters in name
+    start = pos = -1
+    for char in query:
+        pos = name.find(char, pos + 1)
+        if pos < 0:
+            return None
+        if start < 0:
+            start = pos
+    return pos - start + 1 if query else 0
@@ -80,6 +80,17 @@ class StackTrace:
                 )
             )
 
+        def format(self) -> str:
+            """
+            :returns: The plain text representation of the stack
+            """
+            b, e = self.xpos
+            return (
+                f"File {self.file}, line {self.ypos}, column {b}:\n"
+                f"    {self.line}\n"
+                f"    {' ' * b}{'^' * max(e - b, 1)}"
+            )
+
         def __eq__(self, other):
             return (
                 self.xpos == other.xpos
@@ -109,6 +120,10 @@ class StackTrace:
     def clear(self):
         self.stacks.clear()
 
+    def format(self) -> str:
+        """Formats the stack trace as plain text."""
+        return "\n".join(stack.format() for stack in self.stacks)
+
     def show(self):
         """Display the entire stack trace."""
         last = None
@@ -128,6 +143,13 @@ class ShellsyException(Exception):
         self.stacktrace = stacktrace
         self.message = msg
 
+    def format(self) -> str:
+        """Formats the exception and it's stack trace as plain text."""
+        return (
+            self.stacktrace.format()
+            + f"\nS_Exception {self.__class__.__name__}: {self.message}"
+        )
+
     def show(self):
         self.stacktrace.show()
         rich.print(
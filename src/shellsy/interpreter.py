@@ -25,10 +25,18 @@ from .lang import (
     _Parser,
     S_NameSpace,
     S_Literal,
+    S_Background,
+    S_Broadcast,
     S_Command,
+    S_Pipeline,
+    S_SystemCommand,
     Nil,
     S_Variable,
     S_Word,
+    S_Point,
+    Token,
+    _Tokenizer,
+    _run,
 )
 from .exceptions import (
     StackTrace,
@@ -39,26 +47,65 @@ from .exceptions import (
 )
 from .shell import Shell, S_Arguments
 from .shellsy import Shellsy
+from .cache import LRUCache
+from .jobs import JobTable
+import asyncio
 import os
+import threading
+import weakref
 
+from bisect import bisect_left
+from bisect import insort
 from decimal import Decimal
 from pathlib import Path
+from types import MappingProxyType
+from typing import Iterable
+from typing import Iterator
+from typing import Mapping
 from typing import Optional
 
 
+_CONSTANTS = {"True": True, "False": False, "Nil": Nil, "None": None}
+
+
+class _ItemError(Exception):
+    """
+    Carries an error raised in a list or dictionnary item out of the
+    bracket literals, with the start of the enclosing items, outermost
+    first.
+    """
+
+    def __init__(self, error, starts: list[int]):
+        super().__init__(error, starts)
+        self.error = error
+        self.starts = starts
+
+
 class S_Scope(dict):
     """
     An scope contains a scope variables, and an optional parent to fetch
     variables from as in a more global scope.
+
+    Names are resolved through a cache mapping them to the scope holding
+    them, dropped when `generation` changes, as variables are created or
+    deleted in any scope. The dict methods changing the scope all go
+    through `__setitem__` and `__delitem__` to keep it valid.
+
+    The flattened view of the scope and it's parents, and it's sorted names,
+    are kept once built, only the names assigned since in the scope or a
+    parent are resolved again. They are guarded by a lock, as completion
+    reads them from a thread while background jobs assign variables.
     """
 
     parents: "list[S_Scope]"
+    nonlocals: set[str]
+    generation: int = 0
 
     def __init__(
         self,
         init: dict[str, S_Literal] = None,
         parents: "Optonal[list[S_Scope]]" = None,
-        nonlocals: list[str] = None,
+        nonlocals: "Optional[Iterable[str]]" = None,
     ):
         """
         Initializes the scope with the specified predefined values and parent.
@@ -68,38 +115,161 @@ class S_Scope(dict):
         """
         super().__init__(init or {})
         self.parents = parents or []
-        self.nonlocals = nonlocals or []
+        self.nonlocals = set(nonlocals or ())
+        self._owners = {}
+        self._generation = S_Scope.generation
+        self._children = []
+        self._view = None
+        self._names = None
+        self._dirty = set()
+        self._lock = threading.Lock()
+        for parent in self.parents:
+            parent._children.append(weakref.ref(self, parent._children.remove))
+
+    def owner(self, item: str) -> "Optional[S_Scope]":
+        """
+        :returns: The scope holding the variable item, seen from this
+        scope, or `None` if undefined
+        """
+        if self._generation != S_Scope.generation:
+            self._owners.clear()
+            self._generation = S_Scope.generation
+        try:
+            return self._owners[item]
+        except KeyError:
+            pass
+        # undefined names are not kept, so probing them can't grow the map
+        if (owner := self._find(item)) is not None:
+            self._owners[item] = owner
+        return owner
+
+    def _find(self, item: str) -> "Optional[S_Scope]":
+        if item in self:
+            return self
+        for parent in self.parents:
+            if (owner := parent._find(item)) is not None:
+                return owner
+        return None
 
     def __getitem__(self, item: str):
-        if item not in self:
-            for x in self.parents:
-                try:
-                    return x[item]
-                except KeyError:
-                    continue
-            else:
-                raise KeyError(item)
-        else:
-            return super().__getitem__(item)
+        if (owner := self.owner(item)) is None:
+            raise KeyError(item)
+        return dict.__getitem__(owner, item)
 
     def get(self, item: str, default=None):
-        try:
-            return self[item]
-        except KeyError:
+        if (owner := self.owner(item)) is None:
             return default
+        return dict.__getitem__(owner, item)
 
     def __setitem__(self, item: str, value):
         if item in self.nonlocals:
             for parent in self.parents:
                 if item in parent:
                     parent[item] = value
-        return super().__setitem__(item, value)
+        if item not in self:
+            S_Scope.generation += 1
+        super().__setitem__(item, value)
+        self._changed(item)
 
-    def resolved(self):
-        var = {}
-        [var.update(p.resolved()) for p in reversed(self.parents)]
-        var.update(self)
-        return var
+    def __delitem__(self, item: str):
+        super().__delitem__(item)
+        S_Scope.generation += 1
+        self._changed(item)
+
+    def update(self, *args, **kwargs):
+        for item, value in dict(*args, **kwargs).items():
+            self[item] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, item: str, default=None):
+        if item not in self:
+            self[item] = default
+        return dict.__getitem__(self, item)
+
+    def pop(self, item: str, *default):
+        if item not in self:
+            if default:
+                return default[0]
+            raise KeyError(item)
+        value = dict.__getitem__(self, item)
+        del self[item]
+        return value
+
+    def popitem(self):
+        if not self:
+            raise KeyError("popitem(): scope is empty")
+        item = next(reversed(self.keys()))
+        return item, self.pop(item)
+
+    def clear(self):
+        for item in list(self.keys()):
+            del self[item]
+
+    def _changed(self, item: str):
+        with self._lock:
+            if self._view is not None:
+                self._dirty.add(item)
+        if self._children:
+            for ref in self._children[:]:
+                if (child := ref()) is not None:
+                    child._changed(item)
+
+    def _refresh(self) -> dict:
+        with self._lock:
+            return self._update_view()
+
+    def _update_view(self) -> dict:
+        if self._view is None:
+            view = {}
+            for parent in reversed(self.parents):
+                view.update(parent._refresh())
+            view.update(self)
+            self._view = view
+            self._names = sorted(view)
+        elif self._dirty:
+            view, names = self._view, self._names
+            for item in self._dirty:
+                try:
+                    val = self[item]
+                except KeyError:
+                    if item in view:
+                        del view[item]
+                        del names[bisect_left(names, item)]
+                else:
+                    if item not in view:
+                        insort(names, item)
+                    view[item] = val
+        self._dirty.clear()
+        return self._view
+
+    def resolved(self) -> Mapping[str, S_Literal]:
+        """
+        :returns: A read only view of the variables of the scope and it's
+        parents
+        """
+        return MappingProxyType(self._refresh())
+
+    def names(
+        self, prefix: str = "", limit: Optional[int] = None
+    ) -> list[str]:
+        """
+        :param prefix: The start of the names
+        :param limit: The maximum number of names returned
+
+        :returns: The sorted names of the variables visible from the scope
+        starting with prefix
+        """
+        with self._lock:
+            self._update_view()
+            names = self._names
+            start = bisect_left(names, prefix)
+            stop = bisect_left(names, prefix + "\U0010ffff", start)
+            if limit is not None:
+                stop = min(stop, start + limit)
+            return names[start:stop]
 
 
 class S_Context:
@@ -126,301 +296,409 @@ class S_Context:
 class S_Interpreter:
     context: S_Context
     shell: Shell
+    parse_cache: LRUCache
+    jobs: JobTable
 
     def __init__(
         self,
         shell: Optional[Shell] = None,
         stacktrace: Optional[StackTrace] = None,
         context: Optional[S_Context] = None,
+        parse_cache_size: int = 256,
     ):
+        """
+        :param shell: The root shell, defaults to a new `Shellsy`
+        :param stacktrace: The stacktrace errors are reported to
+        :param context: The interpreter context
+        :param parse_cache_size: The number of parsed command lines to keep,
+        `0` disables the cache
+        """
         self.shell = shell or Shellsy()
         self.shell.set_interpreter(self)
         self.stacktrace = stacktrace or StackTrace()
         self.context = context or S_Context()
+        self.parse_cache = LRUCache(parse_cache_size)
+        self.jobs = JobTable()
+
+    @property
+    def parse_cache_size(self) -> int:
+        return self.parse_cache.maxsize
+
+    @parse_cache_size.setter
+    def parse_cache_size(self, size: int):
+        self.parse_cache.maxsize = size
+
+    def parse_cache_info(self) -> dict[str, int]:
+        """
+        :returns: The parsed commands cache `hits`, `misses`, `size`
+        and `maxsize`
+        """
+        return self.parse_cache.info()
 
     def eval(self, line: str):
-        if line.strip().startswith("!"):
-            return os.system(line[1:])
         self.stacktrace.clear()
-        command = self.parse_line(line)
-        if isinstance(command, S_Command):
+        return self.evaluate(self.parse_line(line))
+
+    async def aeval(
+        self, line: str, stacktrace: Optional[StackTrace] = None
+    ):
+        """
+        Evaluates line, awaiting asynchronous commands on the running event
+        loop instead of blocking it.
+
+        :param stacktrace: The stacktrace errors of the line are reported
+        to, instead of the interpreter's, for lines evaluated concurrently
+        """
+        self.stacktrace.clear()
+        if stacktrace is None:
+            return await self.aevaluate(self.parse_line(line))
+        try:
+            command = self.parse_line(line)
+        except ShellsyException as e:
+            stacktrace.stacks.extend(e.stacktrace.stacks)
+            e.stacktrace = stacktrace
+            raise
+        return await self.aevaluate(command, stacktrace)
+
+    async def agather(self, *lines: str) -> list:
+        """
+        Evaluates the lines concurrently, so asynchronous commands overlap
+        their waits, each line reporting errors on it's own stacktrace
+
+        :returns: The list of the lines results
+        """
+        return list(
+            await asyncio.gather(
+                *(self.aeval(line, StackTrace()) for line in lines)
+            )
+        )
+
+    def evaluate(self, command):
+        """
+        Evaluates a command returned by `parse_line`, running asynchronous
+        commands to completion
+
+        :param command: The parsed command
+        :returns: The command result
+        """
+        if isinstance(
+            command, (S_Command, S_Pipeline, S_SystemCommand, S_Background)
+        ):
             try:
-                return command.evaluate()
+                return _run(command.evaluate())
             except S_Exception as e:
                 self.stacktrace.add_stack(e.stack())
                 raise ShellsyException(e.msg, self.stacktrace) from e
         else:
             return command
 
+    async def aevaluate(
+        self, command, stacktrace: Optional[StackTrace] = None
+    ):
+        """
+        Evaluates a command returned by `parse_line` in the running event
+        loop
+
+        :param command: The parsed command
+        :param stacktrace: The stacktrace errors are reported to, defaults
+        to the interpreter's
+        :returns: The command result
+        """
+        try:
+            if isinstance(command, (S_Command, S_Pipeline)):
+                return await command.aevaluate()
+            elif isinstance(command, S_SystemCommand):
+                return await asyncio.to_thread(command.evaluate)
+            elif isinstance(command, S_Background):
+                return command.evaluate()
+            else:
+                return command
+        except S_Exception as e:
+            if stacktrace is None:
+                stacktrace = self.stacktrace
+            stacktrace.add_stack(e.stack())
+            raise ShellsyException(e.msg, stacktrace) from e
+
     def parse_line(self, line: str):
-        # can be comment or shellsy command
+        # can be comment, system or shellsy command
         line = line.rstrip()
         if line.strip().startswith("#"):  # comment, we pass
             return None
+        elif len(line) > 1 and line[-1] == "&" and line[-2].isspace():
+            line = line[:-1].rstrip()
+            return S_Background(self.parse_line(line), self.jobs, line)
+        elif line.strip().startswith("!"):
+            return S_SystemCommand(line.strip()[1:])
         else:  # shellsy command
-            cmd, args = self.parse_command(line)
-            return S_Command(cmd, args)
+            # the generation changes when subshells are imported, which
+            # could change what the command name resolves to
+            key = (self.shell.shellsy.generation, line)
+            cached = self.parse_cache.get(key)
+            if cached is None:
+                cached = self.parse_pipeline(line)
+                self.parse_cache.set(key, cached)
+            commands = [
+                S_Command(cmd, args.copy(), name) for name, cmd, args in cached
+            ]
+            if len(commands) == 1:
+                return commands[0]
+            return S_Pipeline(commands)
+
+    def parse_pipeline(self, line: str):
+        """
+        Parses the `|` separated command calls of line
 
-    def parse_command(self, call: str):
+        :param line: The command line
+        :returns: A list of (`name`, `Command`, `S_Arguments`) tuples
+        """
+        stages = []
         pos = 0
+        while pos is not None:
+            name, command, arguments, pos = self.parse_command(line, pos)
+            stages.append((name, command, arguments))
+        return stages
+
+    def parse_command(self, call: str, pos: int = 0):
+        """
+        Parses the command call at pos, up to the end of call or the next
+        `|`.
+
+        :param call: The command line
+        :param pos: The position of the call in the line
+
+        :returns: A tuple of the command name, the `Command`, the
+        `S_Arguments` and the position after the `|` ending the call, or
+        None
+        """
         cmd_name, end = _Parser.next_command_name(call, pos)
-        self.stacktrace.add(
-            pos, end + 1 if end == pos else end, 0, call, "<command>"
-        )
         try:
-            command = self.get_command(cmd_name)
+            command = self.get_command(cmd_name or "")
         except NoSuchCommand as e:
+            self.stacktrace.add(
+                pos, end + 1 if end == pos else end, 0, call, "<command>"
+            )
             raise ShellsyException(e.msg, self.stacktrace)
-        self.stacktrace.pop()
         pos = end
 
-        arguments = self.parse_arguments(call, pos)
+        arguments, pos = self._parse_arguments(call, pos)
 
-        return command, arguments
+        return cmd_name, command, arguments, pos
 
     def get_command(self, name: str):
         return self.shell.get_command(name)
 
     def parse_arguments(self, string: str, pos: int = 0):
+        """
+        Parses the arguments in string from pos, up to the end of the string
+        or the first `|`.
+
+        :returns: The `S_Arguments`
+        """
+        return self._parse_arguments(string, pos)[0]
+
+    def _parse_arguments(self, string: str, pos: int = 0):
         if string[pos:].strip() == "":
-            return S_Arguments([], {}, "")
-        else:
-            args = []
-            kwargs = {}
-            last_key = None
-            while pos < len(string):
-                self.stacktrace.add(
-                    pos + 1, len(string), 1, string, "<argument>"
-                )
-                lit, idx = _Parser.next_key(string, pos)  # try get a key
-                if lit is not None:  # found key
-                    last_key = (lit, idx - len(lit))
-                    kwargs[last_key] = (Nil, None)
+            return S_Arguments([], {}, ""), None
+        args = []
+        kwargs = {}
+        last_key = None
+        tokens = _Tokenizer.tokenize(string, pos)
+        # only integer positions are tracked while parsing, the stacks are
+        # built if an error is raised
+        try:
+            for token in tokens:
+                if token.type == "pipe":
+                    return S_Arguments(args, kwargs, string), token.end
+                elif token.type == "key":  # found key
+                    last_key = (token.text[1:], token.begin)
+                    kwargs[last_key] = (Nil, (token.begin, token.text))
+                    pos = token.end
+                    continue
+                elif token.type == "broadcast":
+                    val, end = self.parse_value(next(tokens), tokens, string)
+                    val = S_Broadcast(val, threaded=token.text == "@@")
                 else:
-                    try:
-                        lit, idx = _Parser.next_literal(string, pos)
-                    except _Parser.WrongLiteral as wl:
-                        msg, text, begin, pos, end = wl.params
-                        self.stacktrace.add(pos, end, 1, text, "<literal>")
-                        raise ShellsyException(
-                            msg,
-                            self.stacktrace,
-                        ) from wl
-                    else:
-                        if lit is None:
-                            raise ShellsyException(
-                                "Unrecognised literal", self.stacktrace
-                            )
-                        try:
-                            val = self.evaluate_literal(
-                                lit, idx - len(lit), string
-                            )
-                        except WrongLiteral as e:
-                            stack = e.stack()
-                            if stack.xpos[0] != 0:
-                                self.stacktrace.pop()
-                                self.stacktrace.add_stack(e.stack())
-                            raise ShellsyException(
-                                e.msg,
-                                self.stacktrace,
-                            ) from e
-
-                        v = (val, (idx - len(lit), lit))
-                        if last_key is not None:
-                            kwargs[last_key] = v
-                        else:
-                            args.append(v)
-                pos = idx
+                    val, end = self.parse_value(token, tokens, string)
+                lit = string[token.begin : end]
+                v = (val, (token.begin, lit))
+                if last_key is not None:
+                    kwargs[last_key] = v
+                    last_key = None
+                else:
+                    args.append(v)
+                pos = end
+        except (_Parser.WrongLiteral, WrongLiteral) as e:
+            self._literal_error(e, string, pos)
+        except _ItemError as e:
+            self._literal_error(e.error, string, pos, e.starts)
+        return S_Arguments(args, kwargs, string), None
+
+    def _literal_error(self, error, string: str, pos: int, starts=()):
+        # wraps error in the argument stack and the stacks of the bracket
+        # items it was raised in, as the literal stack replaces the
+        # innermost one
+        self.stacktrace.add(pos + 1, len(string), 1, string, "<argument>")
+        for start in starts:
+            self.stacktrace.add(start, len(string), 1, string, "<argument>")
+        if isinstance(error, _Parser.WrongLiteral):
+            msg, text, begin, lpos, lend = error.params
+            self.stacktrace.add(lpos, lend, 1, text, "<literal>")
+            raise ShellsyException(msg, self.stacktrace) from error
+        elif isinstance(error, WrongLiteral):
+            stack = error.stack()
+            if stack.xpos[0] != 0:
                 self.stacktrace.pop()
-            return S_Arguments(args, kwargs, string)
+                self.stacktrace.add_stack(stack)
+            raise ShellsyException(error.msg, self.stacktrace) from error
+        raise ShellsyException(error, self.stacktrace)
 
-    def evaluate_literal(
-        self, string: str, pos=0, full_string=None
-    ) -> S_Literal:
-        import decimal
-
-        string_set = set(string)
-        full_string = full_string or string
-
-        if string == "True":
-            return True
-        elif string == "False":
-            return False
-        elif string == "Nil":
-            return Nil
-        elif string == "None":
-            return None
-        elif string[0] == "$":
-            return S_Variable(string[1:], self.context)
-        elif len(string_set - _Parser.INTEGER) == 0:
-            try:
-                return int(string)
-            except Exception as e:
-                raise WrongLiteral(
-                    str(e),
-                    full_string,
-                    pos,
+    def evaluate_token(self, token: Token, string: str) -> S_Literal:
+        """
+        Evaluates the literal value of a single, non bracket, token
+
+        :param token: The token to evaluate
+        :param string: The string the token was taken from
+
+        :returns: The literal value
+        """
+        kind, text = token.type, token.text
+        if kind == "word":
+            if text in _CONSTANTS:
+                return _CONSTANTS[text]
+            return S_Word(text)
+        elif kind == "number":
+            if "." in text:
+                return Decimal(text)
+            return int(text)
+        elif kind == "string":
+            return text[1:-1]
+        elif kind == "variable":
+            return S_Variable(text[1:], self.context)
+        elif kind == "path":
+            return Path(os.path.expandvars(text[1:-1]))
+        elif kind == "slice":
+            return slice(*map(int, text.split(":")))
+        elif kind == "point":
+            return S_Point(map(Decimal, text.split(",")))
+        elif kind == "empty_dict":
+            return dict()
+        else:
+            raise WrongLiteral(
+                f"unexpected {text!r}", string, token.begin, text
+            )
+
+    def parse_value(
+        self, token: Token, tokens: Iterator[Token], string: str
+    ) -> tuple[S_Literal, int]:
+        """
+        Builds the literal value starting at token, consuming the tokens of
+        list and dictionnary literals from tokens as it goes.
+
+        :param token: The first token of the value
+        :param tokens: The token stream token was taken from
+        :param string: The tokenized string
+
+        :returns: A tuple of the value, and the index after it's last token
+        """
+        if token.type != "lbracket":
+            return self.evaluate_token(token, string), token.end
+        item = next(tokens, None)
+        if item is not None and item.type == "key":
+            return self._parse_dict(token, item, tokens, string)
+        values = []
+        while True:
+            if item is None:
+                raise _Parser.WrongLiteral(
+                    "Unterminated list",
                     string,
+                    token.begin,
+                    len(string) - 1,
+                    len(string),
                 )
-        elif len(string_set - _Parser.NUMBER) == 0:
-            try:
-                return Decimal(string)
-            except Exception as e:
+            elif item.type == "rbracket":
+                return values, item.end
+            elif item.type == "key":
                 raise WrongLiteral(
-                    str(e),
-                    full_string,
-                    pos,
+                    "key in list literal", string, item.begin, item.text
+                )
+            values.append(self._parse_item(item, tokens, string))
+            item = next(tokens, None)
+
+    def _parse_dict(
+        self,
+        opening: Token,
+        item: Token,
+        tokens: Iterator[Token],
+        string: str,
+    ) -> tuple[dict, int]:
+        values = {}
+        name = None
+        while True:
+            if item is None:
+                raise _Parser.WrongLiteral(
+                    "Unterminated dict",
                     string,
+                    opening.begin,
+                    len(string) - 1,
+                    len(string),
                 )
-        elif string[0] in _Parser.STRING_QUOTES:
-            if string[0] != string[-1]:
-                raise WrongLiteral(
-                    f"unterminated string literal",
-                    full_string,
-                    pos + len(string) - 1,
-                    string[-1],
+            elif item.type == "rbracket":
+                return values, item.end
+            elif item.type == "key":
+                name = item.text[1:]
+                values[name] = Nil
+            elif name is None:
+                raise _ItemError(
+                    "non key preceeded value in dictionnary", [item.begin]
                 )
-            return str(string[1:-1])
-        elif string[0] == string[-1] == "/":
-            return Path(os.path.expandvars(string[1:-1]))
-        elif string[0] == "[" and string[-1] == "]":
-            if string == "[]":
-                return list()
-            elif string == "[-]":
-                return dict()
-            elif (
-                string.startswith("[-")
-                and len(string) > 2
-                and string[2].isalpha()
-            ):
-                kwargs = {}
-                last_key = None
-                ipos = 1
-                while ipos < len(string):
-                    self.stacktrace.add(
-                        ipos + 1, len(string), 1, string, "<argument>"
-                    )
-                    lit, idx = _Parser.next_key(string, ipos)  # try get a key
-                    if lit is not None:  # found key
-                        last_key = lit[1:]
-                        kwargs[last_key] = Nil
-                    else:
-                        try:
-                            lit, idx = _Parser.next_literal(string, ipos)
-                        except _Parser.WrongLiteral as wl:
-                            msg, text, begin, ipos, end = wl.params
-                            self.stacktrace.add(
-                                ipos, end, 1, text, "<key value>"
-                            )
-                            raise ShellsyException(
-                                msg,
-                                self.stacktrace,
-                            ) from wl
-                        else:
-                            if lit is not None:
-                                try:
-                                    val = self.evaluate_literal(
-                                        lit, idx - len(lit), string
-                                    )
-                                except WrongLiteral as e:
-                                    stack = e.stack()
-                                    if stack.xpos[0] != 0:
-                                        self.stacktrace.pop()
-                                        self.stacktrace.add_stack(e.stack())
-                                    raise ShellsyException(
-                                        e.msg,
-                                        self.stacktrace,
-                                    ) from e
-                                if last_key is not None:
-                                    kwargs[last_key] = val
-                                    last_key = None
-                                else:
-                                    raise ShellsyException(
-                                        "non key preceeded value in "
-                                        "dictionnary",
-                                        self.stacktrace,
-                                    )
-                            else:
-                                break
-                    ipos = idx
-                    self.stacktrace.pop()
-                return kwargs
             else:
-                args = []
-                ipos = 1
-                while ipos < len(string):
-                    self.stacktrace.add(
-                        ipos + 1, len(string), 1, string, "<argument>"
-                    )
-                    try:
-                        lit, idx = _Parser.next_literal(string, ipos)
-                    except _Parser.WrongLiteral as wl:
-                        msg, text, begin, ipos, end = wl.params
-                        self.stacktrace.add(ipos, end, 1, text, "<key value>")
-                        raise ShellsyException(
-                            msg,
-                            self.stacktrace,
-                        ) from wl
-                    else:
-                        if lit is not None:
-                            try:
-                                val = self.evaluate_literal(
-                                    lit, idx - len(lit), string
-                                )
-                            except WrongLiteral as e:
-                                stack = e.stack()
-                                if stack.xpos[0] != 0:
-                                    self.stacktrace.pop()
-                                    self.stacktrace.add_stack(e.stack())
-                                raise ShellsyException(
-                                    e.msg,
-                                    self.stacktrace,
-                                ) from e
-                            args.append(val)
-                        else:
-                            break
-                    ipos = idx
-                    self.stacktrace.pop()
-                return args
-        elif (
-            ":" in string
-            and len(string_set - _Parser.NUMBER | _Parser.SLICE) == 0
-        ):
-            if len(d := (string_set - _Parser.SLICE)) > 0:
-                idx = pos + min(string.index(t) for t in d)
+                values[name] = self._parse_item(item, tokens, string)
+                name = None
+            item = next(tokens, None)
+
+    def _parse_item(
+        self, item: Token, tokens: Iterator[Token], string: str
+    ) -> S_Literal:
+        try:
+            return self.parse_value(item, tokens, string)[0]
+        except _ItemError as e:
+            e.starts.insert(0, item.begin)
+            raise
+        except (_Parser.WrongLiteral, WrongLiteral) as e:
+            raise _ItemError(e, [item.begin]) from e
+
+    def evaluate_literal(
+        self, string: str, pos=0, full_string=None
+    ) -> S_Literal:
+        """
+        Evaluates the single literal string
+
+        :param string: The literal text
+        :param pos: The literal position in full_string
+        :param full_string: The text the literal was taken from, used for
+        error positions
+
+        :returns: The literal value
+        """
+        text = (full_string or string)[: pos + len(string)]
+        tokens = _Tokenizer.tokenize(text, pos if full_string else 0)
+        token = next(tokens, None)
+        if token is None:
+            raise WrongLiteral("empty literal", text, pos, string)
+        try:
+            val, _ = self.parse_value(token, tokens, text)
+        except _ItemError as e:
+            if isinstance(e.error, str):
+                start = e.starts[-1]
                 raise WrongLiteral(
-                    "wrong slice",
-                    full_string,
-                    idx,
-                    full_string[idx : idx + 1],
-                )
-            else:
-                return slice(*map(int, string.split(":")))
-        elif len(string_set - _Parser.POINT) == 0:
-            values = []
-            pos = 0
-            while pos < len(string):
-                begin = pos
-                if "," in string[pos:]:
-                    end = string.index(",", pos)
-                else:
-                    end = len(string)
-                try:
-                    dec = Decimal(string[begin:end])
-                except decimal.InvalidOperation as e:
-                    raise WrongLiteral(
-                        str(e),
-                        full_string,
-                        begin,
-                        string[begin:end],
-                    ) from e
-                else:
-                    values.append(dec)
-                finally:
-                    pos = end + 1
-            return S_Point(map(Decimal, string.split(",")))
-        else:
-            return S_Word(string)
+                    e.error, text, start, text[start:]
+                ) from e
+            raise e.error from e
+        if (extra := next(tokens, None)) is not None:
+            raise WrongLiteral(
+                f"unexpected {extra.text!r}", text, extra.begin, extra.text
+            )
+        return val
 
     def evaluate_expression(self, S_Expression, type, text, context):
         if type not in S_Expression.evaluators:
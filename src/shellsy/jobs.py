@@ -0,0 +1,263 @@
+"""
+Shellsy: An extensible shell program designed for ease of use and flexibility.
+
+This module holds the background jobs table.
+
+Copyright (C) 2024 ken-morel
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import threading
+import warnings
+
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+from .exceptions import S_Exception
+from .exceptions import ShellsyException
+from .exceptions import StackTrace
+from .lang import _run
+
+
+class Job:
+    """
+    A command running in the background, holds
+
+    - **id**: `int`: the job number
+    - **line**: `str`: the command line
+    - **future**: `Future`: the future of the command result
+    """
+
+    id: int
+    line: str
+    future: Future
+
+    def __init__(self, id: int, line: str, future: Future):
+        self.id = id
+        self.line = line
+        self.future = future
+
+    @property
+    def status(self) -> str:
+        """
+        One of `running`, `done`, `failed` or `cancelled`
+        """
+        if self.future.cancelled():
+            return "cancelled"
+        elif not self.future.done():
+            return "running"
+        elif self.future.exception() is not None:
+            return "failed"
+        else:
+            return "done"
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """
+        Waits for the job and returns it's result
+
+        :raises ShellsyException: If the command failed
+        """
+        return self.future.result(timeout)
+
+    def __repr__(self):
+        return f"[{self.id}] {self.status}: {self.line}"
+
+
+class JobTable:
+    """
+    Runs commands on a thread pool and keeps track of them until they are
+    waited for.
+    """
+
+    jobs: dict[int, Job]
+    listeners: list[Callable[[Job], Any]]
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        :param max_workers: The thread pool size, the executor is only
+        created with the first job
+        """
+        self.max_workers = max_workers
+        self.jobs = {}
+        self.listeners = []
+        self._executor = None
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.max_workers, thread_name_prefix="shellsy-job"
+            )
+        return self._executor
+
+    def submit(self, command, line: str) -> Job:
+        """
+        Runs the parsed command in the background
+
+        :param command: The parsed command, as returned by
+        `S_Interpreter.parse_line`
+        :param line: The command line, for display
+
+        :returns: The new job
+        """
+        with self._lock:
+            id = self._next_id
+            self._next_id += 1
+            job = Job(id, line, self.executor.submit(_evaluate, command))
+            self.jobs[id] = job
+        job.future.add_done_callback(lambda _: self._done(job))
+        return job
+
+    def _done(self, job: Job):
+        for listener in self.listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                warnings.warn(
+                    f"job [{job.id}] listener {listener!r} failed: {e!r}",
+                    RuntimeWarning,
+                )
+
+    def get(self, id: Optional[int] = None) -> Job:
+        """
+        Gets the job numbered id, or the last one
+
+        :raises KeyError: if there is no such job
+        """
+        if id is None:
+            if not self.jobs:
+                raise KeyError(id)
+            id = max(self.jobs)
+        return self.jobs[id]
+
+    def pop(self, id: Optional[int] = None) -> Job:
+        """
+        Removes and returns the job numbered id, or the last one
+        """
+        job = self.get(id)
+        del self.jobs[job.id]
+        return job
+
+    def wait(self) -> list:
+        """
+        Waits for every job and removes them from the table
+
+        :returns: The jobs results, failed jobs give their exception
+        """
+        results = []
+        for id in sorted(self.jobs):
+            job = self.jobs.pop(id)
+            try:
+                results.append(job.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def __iter__(self):
+        return iter(list(self.jobs.values()))
+
+    def __len__(self):
+        return len(self.jobs)
+
+
+def _evaluate(command):
+    try:
+        return _run(command.evaluate())
+    except S_Exception as e:
+        stacktrace = StackTrace()
+        stacktrace.add_stack(e.stack())
+        raise ShellsyException(e.msg, stacktrace) from e
+
+
+_process_pool = None
+_thread_pool = None
+_worker_root = None
+_worker_shells = {}
+
+
+def thread_pool() -> ThreadPoolExecutor:
+    """
+    Gets the thread pool `@@` broadcasts run their calls in, created on
+    first use with the `thread_pool_size` setting workers.
+    """
+    global _thread_pool
+    if _thread_pool is None:
+        from .settings import get_setting
+
+        _thread_pool = ThreadPoolExecutor(
+            get_setting("thread_pool_size", None),
+            thread_name_prefix="shellsy-broadcast",
+        )
+    return _thread_pool
+
+
+def process_pool() -> ProcessPoolExecutor:
+    """
+    Gets the process pool cpu bound commands run in, created on first use
+    with the `process_pool_size` setting workers, defaults to the cpu count.
+    """
+    global _process_pool
+    if _process_pool is None:
+        from .settings import get_setting
+
+        _process_pool = ProcessPoolExecutor(
+            get_setting("process_pool_size", None) or os.cpu_count()
+        )
+    return _process_pool
+
+
+def shutdown_process_pool(wait: bool = True):
+    """
+    Stops the process pool workers, a new pool is created on next use.
+    """
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait)
+        _process_pool = None
+
+
+def call_in_worker(command, kwargs: dict):
+    """
+    Calls command with it's bound arguments, in a worker process. The
+    command shell is instantiated in the worker if needed.
+    """
+    return command.__func__(_worker_shell(command.parent or command), **kwargs)
+
+
+def _worker_shell(command):
+    global _worker_root
+    if command.shell is not None:
+        return command.shell
+    from .shell import Shell, _resolve_owner
+    from .shellsy import Shellsy
+
+    if _worker_root is None:
+        _worker_root = Shellsy()
+    owner = command.__func__.__qualname__.split(".")[:-1]
+    cls = _resolve_owner(command.__func__.__module__, owner)
+    if not (isinstance(cls, type) and issubclass(cls, Shell)):
+        return None
+    if isinstance(_worker_root, cls):
+        return _worker_root
+    if (shell := _worker_shells.get(cls)) is None:
+        shell = _worker_shells[cls] = cls(parent=_worker_root)
+    return shell
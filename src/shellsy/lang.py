@@ -22,8 +22,15 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
 from decimal import Decimal
+from inspect import _empty
+import asyncio
+import inspect
 from pathlib import Path
 from pyoload import type_match
+from typing import Any
+from typing import Iterator
+from typing import NamedTuple
+import re
 import string
 
 from pyoload import annotate
@@ -48,13 +55,114 @@ class S_NameSpace(S_Object, dict):
 class S_Command(S_Object):
     command: "Command"
     args: "S_Arguments"
+    name: str
 
-    def __init__(self, command: "Command", args: "S_Arguments"):
+    def __init__(
+        self, command: "Command", args: "S_Arguments", name: str = None
+    ):
         self.command = command
         self.args = args
+        self.name = name
+        self.broadcast = any(
+            type(val) is S_Broadcast
+            for val, _ in (*args.args, *args.kwargs.values())
+        )
+
+    def evaluate(self, stream=_empty):
+        """
+        Calls the command with it's arguments, once per element when
+        broadcasting
+
+        :param stream: The output of the previous command in a pipeline
+        """
+        if self.broadcast:
+            return self.command.broadcast(self.args, stream)
+        return self.command(self.args, stream)
+
+    async def aevaluate(self, stream=_empty):
+        """
+        Calls the command, awaiting it if it is asynchronous
+        """
+        val = self.evaluate(stream)
+        if inspect.isawaitable(val):
+            val = await val
+        return val
+
+
+class S_Pipeline(S_Object):
+    """
+    Commands chained with `|`, each receiving the output of the previous one
+    in it's `S_Stream` parameter. Generators returned by a command are
+    passed as is, so they are consumed lazily by the next one.
+    """
+
+    commands: list[S_Command]
+
+    def __init__(self, commands: list[S_Command]):
+        self.commands = commands
+
+    def evaluate(self):
+        stream = _run(self.commands[0].evaluate())
+        for command in self.commands[1:]:
+            stream = _run(command.evaluate(stream))
+        return stream
+
+    async def aevaluate(self):
+        stream = await self.commands[0].aevaluate()
+        for command in self.commands[1:]:
+            stream = await command.aevaluate(stream)
+        return stream
+
+
+class S_Background(S_Object):
+    """
+    A command line ending with `&`, submitted to the interpreter jobs table
+    instead of being waited for.
+    """
+
+    def __init__(self, command, jobs: "JobTable", line: str):
+        self.command = command
+        self.jobs = jobs
+        self.line = line
+
+    def evaluate(self) -> "Job":
+        return self.jobs.submit(self.command, self.line)
+
+
+def _run(val):
+    """
+    Runs val to completion if it is awaitable
+    """
+    if inspect.isawaitable(val):
+        return asyncio.run(_await(val))
+    return val
+
+
+async def _await(val):
+    return await val
+
+
+class S_Stream:
+    """
+    Annotation for the command parameter which receives the output of the
+    previous command in a pipeline.
+    """
+
+
+class S_SystemCommand(S_Object):
+    """
+    A `!` prefixed line, passed as is to the system shell.
+    """
+
+    string: str
+
+    def __init__(self, string: str):
+        self.string = string
 
     def evaluate(self):
-        return self.command(self.args)
+        import os
+
+        return os.system(self.string)
 
 
 class NilType(S_Object):
@@ -147,6 +255,36 @@ class S_Variable(S_Object):
         return self.scope.get(self.name)
 
 
+class S_Broadcast(S_Object):
+    """
+    An argument the command is called over element by element, written
+    `@[...]` or `@$var`, or `@@` to call it on a thread pool.
+    """
+
+    value: Any
+    threaded: bool
+
+    def __init__(self, value: Any, threaded: bool = False):
+        self.value = value
+        self.threaded = threaded
+
+    def items(self) -> list:
+        """
+        :returns: The list of elements, evaluating variables
+
+        :raises TypeError: The value is not a list, tuple or iterator
+        """
+        val = self.value
+        if isinstance(val, S_Variable):
+            val = val()
+        if not isinstance(val, (list, tuple, Iterator)):
+            raise TypeError(f"can't broadcast over {type(val).__name__}")
+        return list(val)
+
+    def __repr__(self):
+        return ("@@" if self.threaded else "@") + repr(self.value)
+
+
 class S_Expression(S_Object):
     evaluators = {}
     type: str
@@ -470,3 +608,91 @@ class _Parser:
         while pos < len(text) and not text[pos].isspace():
             pos += 1
         return text[begin : pos + 1], pos + 1
+
+
+class Token(NamedTuple):
+    """
+    A token emitted by `_Tokenizer`, holds
+
+    - **type**: `str`: the token type, one of the `_Tokenizer` group names
+    - **text**: `str`: the raw token text
+    - **begin**: `int`: the token starting index in the tokenized string
+    - **end**: `int`: the token end index
+    """
+
+    type: str
+    text: str
+    begin: int
+    end: int
+
+
+class _Tokenizer:
+    """
+    Splits argument strings into typed `Token` instances in a single pass
+    over the text, with a single compiled regular expression.
+    """
+
+    _TERM = r"(?=[\s\]]|$)"
+    _DECIMAL = r"[-+]?(?:\d+(?:\.\d*)?|\.\d+)"
+    PATTERN = re.compile(
+        rf"""
+        (?P<space>\s+)
+        |(?P<string>
+            "(?:\\.|[^"\\])*"
+            |'(?:\\.|[^'\\])*'
+            |`(?:\\.|[^`\\])*`
+        )
+        |(?P<unterminated_string>["'`])
+        |(?P<key>-[A-Za-z_][A-Za-z0-9_]*){_TERM}
+        |(?P<slice>[-+]?\d+(?::[-+]?\d+){{1,2}}){_TERM}
+        |(?P<point>{_DECIMAL}(?:,{_DECIMAL})+){_TERM}
+        |(?P<number>{_DECIMAL}){_TERM}
+        |(?P<wrong_number>[-+]?\.?\d[\d.:,+-]*){_TERM}
+        |(?P<empty_dict>\[-\])
+        |(?P<lbracket>\[)
+        |(?P<rbracket>\])
+        |(?P<path>/.*?/){_TERM}
+        |(?P<unterminated_path>/)
+        |(?P<variable>\$[A-Za-z0-9_]*){_TERM}
+        |(?P<pipe>\|){_TERM}
+        |(?P<broadcast>@@?)(?=[\[$])
+        |(?P<word>[^\s\[\]]+)
+        """,
+        re.VERBOSE | re.DOTALL,
+    )
+    ERRORS = {
+        "unterminated_string": "unterminated string literal",
+        "unterminated_path": "Unterminated path",
+        "wrong_number": "wrong number literal",
+    }
+
+    @classmethod
+    def tokenize(cls, text: str, begin: int = 0) -> Iterator[Token]:
+        """
+        Yields the tokens in text from begin, skipping whitespaces
+
+        :param text: The text to tokenize
+        :param begin: The index to start from
+
+        :raises _Parser.WrongLiteral: on unterminated strings or paths, or
+        malformed numbers
+        """
+        for m in cls.PATTERN.finditer(text, begin):
+            kind = m.lastgroup
+            if kind == "space":
+                continue
+            elif kind in cls.ERRORS:
+                start = m.start()
+                msg = cls.ERRORS[kind]
+                if kind == "wrong_number" and ":" in m.group():
+                    # reports the faulty field as the slice parser does
+                    _Parser.next_slice(text, start)
+                    msg = "wrong slice"
+                raise _Parser.WrongLiteral(
+                    msg,
+                    text,
+                    start,
+                    start + 1 if kind == "unterminated_string" else start,
+                    len(text) if kind == "unterminated_string" else m.end(),
+                )
+            yield Token(kind, m.group(), m.start(), m.end())
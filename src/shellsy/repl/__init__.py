@@ -21,6 +21,7 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
+import asyncio
 import cmd
 import comberload
 import os
@@ -28,6 +29,7 @@ import rich
 import rich.markdown
 import time
 
+from collections.abc import Iterator
 from rich.console import Console
 
 from ..exceptions import ShellsyException
@@ -151,6 +153,9 @@ class S_Repl(cmd.Cmd):
     history = os.path.join(data_dir, "history.txt")
     _lexer = None
     _bindings = None
+    _session = None
+    _styles = (None, None)
+    _cwd = (None, None)
     _log = ""
 
     def __init__(
@@ -170,6 +175,7 @@ class S_Repl(cmd.Cmd):
         self.interpreter = interpreter or S_Interpreter(
             context=self.context, shell=self.shell
         )
+        self.interpreter.jobs.listeners.append(self.job_done)
 
         super().__init__()
 
@@ -180,17 +186,69 @@ class S_Repl(cmd.Cmd):
             return self.onecmd(cmd)
 
     def cmdloop(self):
+        asyncio.run(self.acmdloop())
+
+    async def acmdloop(self):
+        """
+        Runs the repl on the event loop, so asynchronous commands are awaited
+        on the same loop as the prompt.
+        """
         self.shouldrun = True
         while self.shouldrun:
-            command = self.get_input()
+            command = await self.get_input_async()
             if command is None:
                 break
             elif not command.strip() or command.strip().startswith("#"):
                 continue
             else:
-                self.onecmd(command.strip())
+                await self.aonecmd(command.strip())
 
     def onecmd(self, command: str):
+        if self.special_command(command):
+            return
+        try:
+            val = self.interpreter.eval(command)
+        except ShellsyException as e:
+            e.show()
+        else:
+            self.show_result(val)
+
+    async def aonecmd(self, command: str):
+        if self.special_command(command):
+            return
+        try:
+            val = await self.interpreter.aeval(command)
+        except ShellsyException as e:
+            e.show()
+        else:
+            self.show_result(val)
+
+    def job_done(self, job):
+        """
+        Shows a background job completion in the status bar, and stores it's
+        result in `out`
+        """
+        try:
+            val = job.result()
+        except Exception:
+            StatusText(f"[{job.id}] failed: {job.line}", 5, f"job-{job.id}")
+            return
+        if isinstance(val, Iterator):
+            val = tuple(val)
+        self.context["out"].append(val)
+        StatusText(
+            f"[{job.id}] done: {job.line} -> "
+            f"out@{len(self.context['out']) - 1}",
+            5,
+            f"job-{job.id}",
+        )
+
+    def special_command(self, command: str) -> bool:
+        """
+        Runs the repl own commands
+
+        :returns: If command was one of them
+        """
         if command == "exit":
             self.shouldrun = False
         elif command == "#c_":
@@ -198,25 +256,24 @@ class S_Repl(cmd.Cmd):
         elif command == "#w_":
             rich.print(rich.markdown.Markdown(WARANTY_NOTICE))
         else:
-            try:
-                val = self.interpreter.eval(command)
-            except ShellsyException as e:
-                e.show()
-            # except Exception as e:
-            #     self.console.print_exception(show_locals=True)
-            else:
-                self.context["_"] = val
-                try:
-                    self.context["out"].append(val)
-                except Exception:
-                    self.context["out"] = [val]
-                rich.print(
-                    (
-                        "[yellow]out[/yellow]@[magenta]"
-                        f"{len(self.context['out']) - 1}[/magenta]>"
-                    ),
-                    val,
-                )
+            return False
+        return True
+
+    def show_result(self, val):
+        if isinstance(val, Iterator):
+            val = tuple(val)
+        self.context["_"] = val
+        try:
+            self.context["out"].append(val)
+        except Exception:
+            self.context["out"] = [val]
+        rich.print(
+            (
+                "[yellow]out[/yellow]@[magenta]"
+                f"{len(self.context['out']) - 1}[/magenta]>"
+            ),
+            val,
+        )
 
     @comberload("prompt_toolkit.lexers")
     def lexer(self):
@@ -301,9 +358,17 @@ class S_Repl(cmd.Cmd):
         return bindings
 
     def format_cwd(self):
-        import os
-
+        """
+        :returns: The formatted working directory, recomputed only when it
+        changes
+        """
         cwd = os.getcwd()
+        if self._cwd[0] == cwd:
+            return self._cwd[1]
+        self._cwd = (cwd, self._format_cwd(cwd))
+        return self._cwd[1]
+
+    def _format_cwd(self, cwd: str):
         shortens = ("", "")
         for name, path in os.environ.items():
             if (
@@ -323,13 +388,18 @@ class S_Repl(cmd.Cmd):
 
     @comberload("prompt_toolkit.styles", "pygments.styles")
     def get_styles(self):
+        """
+        :returns: The prompt style, rebuilt only when the `stylename`
+        setting changes
+        """
         from prompt_toolkit.styles import Style
         from prompt_toolkit.styles import style_from_pygments_cls, merge_styles
         from pygments.styles import get_style_by_name
 
-        base_style = style_from_pygments_cls(
-            get_style_by_name(get_setting("stylename", "monokai"))
-        )
+        stylename = get_setting("stylename", "monokai")
+        if self._styles[0] == stylename:
+            return self._styles[1]
+        base_style = style_from_pygments_cls(get_style_by_name(stylename))
         custom_style = Style.from_dict(
             {
                 # "": "#ffffff",
@@ -343,143 +413,85 @@ class S_Repl(cmd.Cmd):
                 "pygments.punctuation": "red",
             }
         )
-        return merge_styles([base_style, custom_style])
-
-    @comberload(
-        "prompt_toolkit",
-        "prompt_toolkit.styles",
-        "prompt_toolkit.history",
-        "shellsy.lexer",
-    )
-    def get_input(self):
-        import prompt_toolkit
+        self._styles = (stylename, merge_styles([base_style, custom_style]))
+        return self._styles[1]
+
+    def prompt_message(self):
+        return [
+            *self.format_cwd(),
+            ("", "\n"),
+            ("class:shellname", "%"),
+            ("class:prompt", self.prompt),
+        ]
+
+    def prompt_options(self) -> dict:
+        """
+        :returns: The keyword arguments of the prompt_toolkit prompt session,
+        the message and style are recomputed on each render
+        """
         from prompt_toolkit.history import FileHistory
         from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
+        from prompt_toolkit.styles import DynamicStyle
 
-        cwd = self.format_cwd()
-        return prompt_toolkit.prompt(
+        return dict(
             validate_while_typing=True,
             bottom_toolbar=self.bottom_toolbar,
             rprompt=self.right_prompt,
             # enable_history_search=True,
             history=FileHistory(self.history),
             lexer=self.lexer(),
-            message=[
-                *cwd,
-                ("", "\n"),
-                ("class:shellname", "%"),
-                ("class:prompt", self.prompt),
-            ],
-            style=self.get_styles(),
+            message=self.prompt_message,
+            style=DynamicStyle(self.get_styles),
             completer=self.shell_completer(),
             auto_suggest=AutoSuggestFromHistory(),
             mouse_support=True,
             key_bindings=self.key_bindings(),
+            refresh_interval=0.5,
         )
 
+    def session(self):
+        """
+        :returns: The prompt session, created once for the repl life so the
+        history file is read once
+        """
+        from prompt_toolkit import PromptSession
+
+        if self._session is None:
+            self._session = PromptSession(**self.prompt_options())
+        return self._session
+
+    @comberload(
+        "prompt_toolkit",
+        "prompt_toolkit.styles",
+        "prompt_toolkit.history",
+        "shellsy.lexer",
+    )
+    def get_input(self):
+        return self.session().prompt()
+
     @get_input.failback
     def raw_get_input(self):
         return input(self.prompt)
 
+    @comberload(
+        "prompt_toolkit",
+        "prompt_toolkit.styles",
+        "prompt_toolkit.history",
+        "shellsy.lexer",
+    )
+    async def get_input_async(self):
+        return await self.session().prompt_async()
+
+    @get_input_async.failback
+    async def raw_get_input_async(self):
+        return await asyncio.to_thread(input, self.prompt)
+
     @comberload("prompt_toolkit.completion")
     def shell_completer(self):
-        # TDOD: move this to another file and use cls(shell)
-        from prompt_toolkit.completion import Completer, Completion
-
-        def similarity(a, b):
-            import difflib
-
-            return difflib.SequenceMatcher(lambda *_: False, a, b).ratio()
-
-        class ShellCompleter(Completer):
-            def get_completions(_self, document, complete_event):
-                # self.get_possible_subcommands()
-                from string import ascii_letters
-                from pathlib import Path
-
-                line = document.current_line_before_cursor
-                # yield Completion(line, start_position=0)
-                comps = []
-                if len(line) == 0:
-                    return
-                if (
-                    line[0] == "$"
-                    and len(set(line[1:]) - set(ascii_letters + "_")) == 0
-                ):
-                    for v in self.context.scope.resolved():
-                        v = "$" + v
-                        comps.append((similarity(line[1:], v), v))
-                    StatusText(
-                        repr(self.context.scope.get(line[1:])),
-                        5,
-                        source="__entry-var-values__",
-                    )
-                    comps.sort(key=lambda k: -k[0])
-                    for _, x in comps:
-                        yield Completion(x, start_position=-len(line))
-                    return
-                if (
-                    " /" in line
-                    and not line.endswith(" /")
-                    and len(
-                        set(line[line.rindex(" /") + 1 :])
-                        - set(ascii_letters + "/\\ :-.")
-                    )
-                    == 0
-                ):
-                    *_, fpath = line.rsplit(" /", 1)
-                    if "/" in fpath:
-                        path, comp = fpath.rsplit("/", 1)
-                    else:
-                        path, comp = ".", fpath
-                    all = Path(path)
-                    if all.exists() and all.is_dir():
-                        for sub in all.glob("*"):
-                            name = str(sub).replace("\\", "/")
-                            if sub.is_dir():
-                                name += "/"
-                            comps.append(
-                                (
-                                    similarity(str(sub)[-len(comp)], comp),
-                                    name,
-                                    -len(fpath),
-                                )
-                            )
-                    else:
-                        for sword in (
-                            "None",
-                            "Nil",
-                            "True",
-                            "False",
-                        ):
-                            comps.append(
-                                (
-                                    similarity(line, sword[: len(line)]),
-                                    sword,
-                                    -len(line),
-                                )
-                            )
-                if " " not in line:
-                    for cmd in self.shell.get_possible_subcommands():
-                        cmd = cmd.replace(".__entrypoint__", "")
-                        comps.append(
-                            (
-                                similarity(line, cmd[: len(line)]),
-                                cmd,
-                                -len(line),
-                            )
-                        )
-                elif not line.endswith(" "):
-                    _, cline = line.split(" ", 1)
-                    if " " in cline and not cline.endswith(" "):
-                        _, word = cline.rsplit(" ", 1)
-                    else:
-                        word = cline
-                comps.sort(key=lambda c: -c[0] * 100)
-                for _, comp, pos in comps:
-                    yield Completion(comp, start_position=pos)
-
-        return ShellCompleter()
+        from prompt_toolkit.completion import ThreadedCompleter
+        from .completer import ShellCompleter
+
+        return ThreadedCompleter(ShellCompleter(self))
 
     def bottom_toolbar(self):
         from prompt_toolkit import HTML
@@ -0,0 +1,122 @@
+"""
+Shellsy: An extensible shell program designed for ease of use and flexibility.
+
+This module holds the prompt_toolkit completer of the shellsy repl.
+
+Copyright (C) 2024 ken-morel
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import difflib
+
+from prompt_toolkit.completion import Completer
+from prompt_toolkit.completion import Completion
+from string import ascii_letters
+from string import digits
+
+from ..completion import CompletionIndex
+from ..completion import DirectoryCache
+
+
+def similarity(a, b):
+    return difflib.SequenceMatcher(lambda *_: False, a, b).ratio()
+
+
+class ShellCompleter(Completer):
+    """
+    Completes variable names from the sorted names of the scope, paths
+    from directory listings cached in a `DirectoryCache`, and commands
+    looked up in a `CompletionIndex` refreshed when plugins are imported.
+    """
+
+    limit: int = 50
+
+    def __init__(self, repl):
+        """
+        :param repl: The repl which context and shell are completed
+        """
+        self.repl = repl
+        self.index = CompletionIndex()
+        self.directories = DirectoryCache()
+
+    def get_completions(self, document, complete_event):
+        from . import StatusText
+
+        line = document.current_line_before_cursor
+        comps = []
+        if len(line) == 0:
+            return
+        name_chars = set(ascii_letters + "_")
+        if line[0] == "$" and len(set(line[1:]) - name_chars) == 0:
+            scope = self.repl.context.scope
+            StatusText(
+                repr(scope.resolved().get(line[1:])),
+                5,
+                source="__entry-var-values__",
+            )
+            for name in scope.names(line[1:], self.limit):
+                yield Completion("$" + name, start_position=-len(line))
+            return
+        if (
+            " /" in line
+            and not line.endswith(" /")
+            and len(
+                set(line[line.rindex(" /") + 1 :])
+                - set(ascii_letters + digits + "_/\\ :-.")
+            )
+            == 0
+        ):
+            *_, fpath = line.rsplit(" /", 1)
+            comp = fpath.rsplit("/", 1)[-1]
+            directory = fpath[: len(fpath) - len(comp)]
+            try:
+                entries = self.directories.complete(
+                    directory or ".", comp, self.limit
+                )
+            except OSError:
+                entries = None
+            if entries is not None:
+                for name, is_dir in entries:
+                    yield Completion(
+                        directory + name + ("/" if is_dir else ""),
+                        start_position=-len(fpath),
+                    )
+            else:
+                for sword in (
+                    "None",
+                    "Nil",
+                    "True",
+                    "False",
+                ):
+                    comps.append(
+                        (
+                            similarity(line, sword[: len(line)]),
+                            sword,
+                            -len(line),
+                        )
+                    )
+        comps.sort(key=lambda c: -c[0] * 100)
+        for _, comp, pos in comps:
+            yield Completion(comp, start_position=pos)
+        if " " not in line:
+            yield from self.command_completions(line)
+
+    def command_completions(self, line: str):
+        """
+        Yields the best `limit` commands matching line.
+        """
+        self.index.refresh(self.repl.shell.shellsy)
+        for cmd in self.index.complete(line, self.limit):
+            yield Completion(cmd, start_position=-len(line))
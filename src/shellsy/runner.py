@@ -0,0 +1,312 @@
+"""
+Shellsy: An extensible shell program designed for ease of use and flexibility.
+
+This module runs shellsy script files without the interactive repl.
+
+Copyright (C) 2024 ken-morel
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import hashlib
+import io
+import pickle
+import sys
+
+from pathlib import Path
+from typing import Any
+from typing import NamedTuple
+from typing import Optional
+from typing import TextIO
+
+from . import __version__
+from .cache import DiskCache
+from .exceptions import NoSuchCommand
+from .exceptions import ShellsyException
+from .exceptions import StackTrace
+from .interpreter import S_Interpreter
+from .lang import S_Background
+from .lang import S_Command
+from .lang import S_Pipeline
+from .lang import S_Variable
+
+
+class CompiledLine(NamedTuple):
+    """
+    A compiled script line, holds
+
+    - **lineno**: `int`: the line number in the script, from 1
+    - **line**: `str`: the line source
+    - **command**: the parsed command, or `None` when the line could not be
+      compiled ahead, as when it uses a command from a plugin the script
+      imports itself.
+    """
+
+    lineno: int
+    line: str
+    command: Any
+
+
+class S_Script:
+    """
+    A shellsy script, compiled once into a list of executable commands.
+    """
+
+    file: str
+    lines: list[CompiledLine]
+
+    def __init__(self, file: str, lines: list[CompiledLine]):
+        self.file = file
+        self.lines = lines
+
+    @classmethod
+    def compile(
+        cls, stream: TextIO, interpreter: S_Interpreter, file: str = "<script>"
+    ) -> "S_Script":
+        """
+        Compiles every command line read from stream
+
+        :param stream: The script text stream
+        :param interpreter: The interpreter used to parse the lines
+        :param file: The script file name
+
+        :returns: The compiled script
+        """
+        lines = []
+        for lineno, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                command = interpreter.parse_line(line)
+            except ShellsyException:
+                command = None
+            lines.append(CompiledLine(lineno, line, command))
+        return cls(file, lines)
+
+    @classmethod
+    def from_file(
+        cls,
+        path: Path,
+        interpreter: S_Interpreter,
+        cache: "Optional[ScriptCache]" = None,
+    ) -> "S_Script":
+        """
+        Reads and compiles the script at path.
+
+        :param path: The script path
+        :param interpreter: The interpreter to compile the script with
+        :param cache: An optional cache to load and store the compiled
+        script from
+        """
+        if cache is None:
+            with open(path) as f:
+                return cls.compile(f, interpreter, str(path))
+        source = Path(path).read_bytes()
+        key = cache.key(source, interpreter)
+        if (script := cache.load(key, str(path), interpreter)) is not None:
+            return script
+        script = cls.compile(
+            io.StringIO(source.decode()), interpreter, str(path)
+        )
+        cache.store(key, script)
+        return script
+
+
+class _ScriptPickler(pickle.Pickler):
+    def persistent_id(self, obj):
+        if isinstance(obj, S_Variable):
+            return ("var", obj.name)
+        return None
+
+
+class _ScriptUnpickler(pickle.Unpickler):
+    def __init__(self, file, interpreter: S_Interpreter):
+        super().__init__(file)
+        self.interpreter = interpreter
+
+    def persistent_load(self, pid):
+        kind, name = pid
+        if kind == "var":
+            return S_Variable(name, self.interpreter.context)
+        raise pickle.UnpicklingError(f"unknown persistent id {kind!r}")
+
+
+class ScriptCache:
+    """
+    Stores compiled scripts on disk, as command paths and evaluated
+    literals, keyed by the script content hash, the shellsy version and the
+    loaded plugins.
+    """
+
+    disk: DiskCache
+
+    def __init__(self, path: Path, max_bytes: int = 64 * 1024 * 1024):
+        """
+        :param path: The cache directory
+        :param max_bytes: The maximum total size of the cached scripts
+        """
+        self.disk = DiskCache(path, max_bytes)
+
+    def key(self, source: bytes, interpreter: S_Interpreter) -> str:
+        """
+        :returns: The cache key of the script source compiled by interpreter
+        """
+        digest = hashlib.sha256(source)
+        digest.update(__version__.encode())
+        for plugin in sorted(interpreter.shell.shellsy.plugins):
+            digest.update(b"\0" + plugin.encode())
+        return digest.hexdigest()
+
+    def store(self, key: str, script: S_Script):
+        lines = []
+        for lineno, line, command in script.lines:
+            if isinstance(command, S_Background):
+                # the jobs table is rebound on load
+                command = (
+                    "background",
+                    _command_calls(command.command),
+                    command.line,
+                )
+            elif (calls := _command_calls(command)) is not None:
+                command = ("commands", calls)
+            lines.append((lineno, line, command))
+        buf = io.BytesIO()
+        try:
+            _ScriptPickler(buf, pickle.HIGHEST_PROTOCOL).dump(lines)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        self.disk.set(key, buf.getvalue())
+
+    def load(
+        self, key: str, file: str, interpreter: S_Interpreter
+    ) -> Optional[S_Script]:
+        """
+        Loads the script stored at key, rebinding it's commands, variables
+        and background jobs to interpreter.
+
+        :returns: The script, or None if not cached or stale
+        """
+        if (data := self.disk.get(key)) is None:
+            return None
+        try:
+            lines = _ScriptUnpickler(io.BytesIO(data), interpreter).load()
+            compiled = []
+            for lineno, line, command in lines:
+                if isinstance(command, tuple):
+                    kind, calls, *rest = command
+                    command = _rebuild_calls(calls, interpreter)
+                    if kind == "background":
+                        command = S_Background(
+                            command, interpreter.jobs, *rest
+                        )
+                compiled.append(CompiledLine(lineno, line, command))
+        except (
+            NoSuchCommand,
+            pickle.UnpicklingError,
+            EOFError,
+            ValueError,
+            AttributeError,
+            ImportError,
+        ):
+            self.disk.delete(key)
+            return None
+        return S_Script(file, compiled)
+
+
+def _command_calls(command) -> Optional[list[tuple]]:
+    # the (name, arguments) of the commands called, or None
+    if isinstance(command, S_Command):
+        return [(command.name, command.args)]
+    elif isinstance(command, S_Pipeline):
+        return [(cmd.name, cmd.args) for cmd in command.commands]
+    return None
+
+
+def _rebuild_calls(calls: list[tuple], interpreter: S_Interpreter):
+    commands = [
+        S_Command(interpreter.get_command(name or ""), args, name)
+        for name, args in calls
+    ]
+    if len(commands) == 1:
+        return commands[0]
+    return S_Pipeline(commands)
+
+
+class S_Runner:
+    """
+    Runs compiled scripts through an interpreter, reporting errors as plain
+    text.
+    """
+
+    interpreter: S_Interpreter
+
+    def __init__(
+        self,
+        interpreter: Optional[S_Interpreter] = None,
+        keep_going: bool = False,
+        stderr: TextIO = None,
+        cache: Optional[ScriptCache] = None,
+    ):
+        """
+        :param interpreter: The interpreter to run scripts in
+        :param keep_going: Continue running the script after a failed line
+        :param stderr: Where errors are reported, defaults to `sys.stderr`
+        :param cache: The compiled scripts cache, if any
+        """
+        self.interpreter = interpreter or S_Interpreter()
+        self.keep_going = keep_going
+        self.stderr = stderr or sys.stderr
+        self.cache = cache
+
+    def run_file(self, path: Path) -> int:
+        """
+        Compiles and runs the script at path
+
+        :returns: The number of lines which failed
+        """
+        return self.run(S_Script.from_file(path, self.interpreter, self.cache))
+
+    def run(self, script: S_Script) -> int:
+        """
+        Runs each line of the compiled script
+
+        :returns: The number of lines which failed
+        """
+        failed = 0
+        stacktrace = self.interpreter.stacktrace
+        for lineno, line, command in script.lines:
+            stacktrace.clear()
+            try:
+                if command is None:
+                    command = self.interpreter.parse_line(line)
+                self.interpreter.evaluate(command)
+            except Exception as e:
+                failed += 1
+                if not isinstance(e, ShellsyException):
+                    msg = f"{e.__class__.__name__}: {e}"
+                    e = ShellsyException(msg, stacktrace)
+                e.stacktrace.stacks.insert(
+                    0,
+                    StackTrace.Stack(
+                        xpos=(0, len(line)),
+                        line=line,
+                        file=script.file,
+                        ypos=lineno,
+                    ),
+                )
+                print(e.format(), file=self.stderr)
+                if not self.keep_going:
+                    break
+        return failed
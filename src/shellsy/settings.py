@@ -43,6 +43,7 @@ class SettingsFile(dict):
         :param path: the path to the settings file
         """
         self.path = path
+        self._mtime = None
         super().__init__(default)
         try:
             self.load()
@@ -50,12 +51,20 @@ class SettingsFile(dict):
             self.save()
 
     def load(self):
+        """
+        Reads the settings file, if it changed since last read or saved
+        """
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return
         with open(self.path) as f:
             self.update(json.loads(f.read()))
+        self._mtime = mtime
 
     def save(self):
         with open(self.path, "w") as f:
             f.write(json.dumps(self, indent=2))
+        self._mtime = os.stat(self.path).st_mtime_ns
 
 
 _settings = None
@@ -75,6 +84,8 @@ def init():
 
 
 def get_setting(name, default=None):
+    if _settings is None:
+        return default
     _settings.load()
     return _settings.get(name, default)
 
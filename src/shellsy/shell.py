@@ -21,14 +21,22 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 from dataclasses import dataclass
 from inspect import Signature
 from inspect import _empty
+from inspect import isawaitable
 from inspect import signature
 from pyoload import annotate
 from typing import Any
 from typing import Callable
+from typing import Iterator
+from typing import Optional
 
 from .lang import *
 from .help import *
 from .exceptions import NoSuchCommand, ArgumentError
+from .cache import LRUCache
+from .cache import canonical_key
+from .cache import result_cache
+from .validators import annotation_classes
+from .validators import compile_validator
 
 
 @dataclass
@@ -50,6 +58,31 @@ class S_Arguments(S_Object):
     kwargs: dict[Key, Val]
     string: str
 
+    def copy(self) -> "S_Arguments":
+        """
+        Creates a copy of the arguments, with fresh list and dictionnary
+        literals, so a parsed arguments template can be reused across calls.
+        """
+        return S_Arguments(
+            [(_fresh_literal(val), loc) for val, loc in self.args],
+            {
+                key: (_fresh_literal(val), loc)
+                for key, (val, loc) in self.kwargs.items()
+            },
+            self.string,
+        )
+
+
+def _fresh_literal(val):
+    if type(val) is list:
+        return [_fresh_literal(x) for x in val]
+    elif type(val) is dict:
+        return {k: _fresh_literal(v) for k, v in val.items()}
+    elif type(val) is set:
+        return set(val)
+    else:
+        return val
+
 
 @dataclass
 class CommandParameter:
@@ -97,11 +130,80 @@ class CommandParameter:
         return hash(self.name)
 
 
+class BindingPlan:
+    """
+    The binding of arguments to a list of parameters, computed once per
+    command, holds
+
+    - **params**: `tuple[CommandParameter]`: the parameters
+    - **names**: `tuple[str]`: the parameters names
+    - **index**: `dict[str, int]`: maps parameter names to their index
+    - **defaults**: `tuple`: the parameters defaults, `_empty` if required
+    - **required**: `int`: bitmask of the parameters without default
+    - **stream**: `int`: index of the `S_Stream` parameter, or `-1`
+    - **positional**: `tuple[int]`: indexes positional arguments fill
+    - **piped**: `tuple[int]`: the same when the stream parameter is bound
+    - **validators**: per parameter callables taking a value and returning
+      the value to pass, or raising `TypeError`, `None` when not checked
+    """
+
+    __slots__ = (
+        "params",
+        "names",
+        "index",
+        "defaults",
+        "required",
+        "stream",
+        "positional",
+        "piped",
+        "validators",
+    )
+
+    def __init__(self, params: list[CommandParameter]):
+        self.params = tuple(params)
+        self.names = tuple(p.name for p in self.params)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.defaults = tuple(p.default for p in self.params)
+        self.required = 0
+        self.stream = -1
+        for idx, param in enumerate(self.params):
+            if param.default is _empty:
+                self.required |= 1 << idx
+            if param.type is S_Stream and self.stream < 0:
+                self.stream = idx
+        self.positional = tuple(range(len(self.params)))
+        self.piped = tuple(i for i in self.positional if i != self.stream)
+        self.validators = tuple(
+            None if idx == self.stream else _validator(param)
+            for idx, param in enumerate(self.params)
+        )
+
+
+def _validator(param: CommandParameter) -> Optional[Callable]:
+    spec = param.type
+    if spec in (_empty, Any, S_Stream):
+        return None
+    default = param.default
+    check = compile_validator(spec)
+
+    def validate(val):
+        if check(val) or val == default:
+            return val
+        if spec == S_Literal and hasattr(val, "__shellsy_evaluatable__"):
+            val = val()
+            if check(val):
+                return val
+        raise TypeError(val)
+
+    return validate
+
+
 class CommandParameters:
     """
     Holds a list of command parameters for the command
     """
     params: list[CommandParameter]
+    plan: BindingPlan
 
     def __init__(self, params):
         """
@@ -109,6 +211,7 @@ class CommandParameters:
         :param params: The CommandParameter instances
         """
         self.params = params
+        self.plan = BindingPlan(params)
 
     @classmethod
     def from_function(cls, func):
@@ -117,159 +220,562 @@ class CommandParameters:
         :param func: The function to get signature from
         :returns: Th CommandParameters
         """
+        return cls.from_signature(signature(func))
+
+    @classmethod
+    def from_signature(cls, sig: Signature):
+        """
+        Gets the commandparameters from a command function signature, the
+        first parameter, the shell, is skipped.
+        :param sig: The function signature
+        :returns: Th CommandParameters
+        """
         return cls(
             [
                 CommandParameter.from_inspect_parameter(p)
-                for p in tuple(signature(func).parameters.values())[1:]
+                for p in tuple(sig.parameters.values())[1:]
             ]
         )
 
-    def bind(self, args: S_Arguments) -> dict[str, S_Literal]:
+    @property
+    def stream(self) -> Optional[CommandParameter]:
+        """
+        The parameter annotated `S_Stream`, if any
+        """
+        if self.plan.stream < 0:
+            return None
+        return self.plan.params[self.plan.stream]
+
+    def bind(
+        self, args: S_Arguments, stream: Any = _empty
+    ) -> dict[str, S_Literal]:
         """
         binds the given arguments to the contained parameters
 
         :param args: The `S_Arguments` instance to bind
+        :param stream: The output of the previous pipeline command, bound to
+        the `S_Stream` parameter
         :returns: A dictionarry mapping of names to values
         """
-        kwargs = {}
-        for idx, (val, (pos, raw)) in enumerate(args.args):
-            if idx >= len(self.params):
+        plan = self.plan
+        if not plan.required and stream is _empty and not (
+            args.args or args.kwargs
+        ):
+            return {}
+        names = plan.names
+        validators = plan.validators
+        final_args = {}
+        bound = 0
+        order = plan.positional
+        if stream is not _empty:
+            if plan.stream < 0:
                 raise ArgumentError(
-                    f"Extra positional argument",
+                    "command does not take piped input",
+                    args.string,
+                    0,
                     args.string,
-                    pos,
-                    raw,
                 )
-            param = self.params[idx]
-            kwargs[param] = ((pos, raw), val)
+            final_args[names[plan.stream]] = stream
+            bound = 1 << plan.stream
+            order = plan.piped
+        if len(args.args) > len(order):
+            val, (pos, raw) = args.args[len(order)]
+            raise ArgumentError(
+                f"Extra positional argument",
+                args.string,
+                pos,
+                raw,
+            )
+        for idx, (val, (pos, raw)) in zip(order, args.args):
+            if (validate := validators[idx]) is not None:
+                try:
+                    val = validate(val)
+                except TypeError:
+                    raise self._invalid(idx, val, args, pos, raw) from None
+            final_args[names[idx]] = val
+            bound |= 1 << idx
 
         for (key, pos), (val, (pos, raw)) in args.kwargs.items():
-            for x in self.params:
-                if x.name == key:
-                    param = x
-                    break
-            else:
+            idx = plan.index.get(key)
+            if idx is None:
                 raise ArgumentError(
                     f"Extra keyword argument",
                     args.string,
                     pos,
                     raw,
                 )
-            if param in kwargs:
+            if bound >> idx & 1:
                 raise ArgumentError(
-                    f"Keyword argument: {param} received. but was already "
-                    "set (surely in positional parameters)",
+                    f"Keyword argument: {plan.params[idx]} received. but was "
+                    "already set (surely in positional parameters)",
                     args.string,
                     pos,
                     raw,
                 )
-            kwargs[param] = ((pos, raw), val)
-
-        for idx, param in enumerate(self.params):
-            if param not in kwargs and param.default is _empty:
-                raise ArgumentError(
-                    f"missing argument for {param}", args.string, 0, args.string
-                )
-
-        final_args = {}
-        for param, ((pos, text), val) in kwargs.items():
-            if val == param.default:
-                final_args[param.name] = val
-                continue
-            if not type_match(val, param.type):
-                if param.type == S_Literal and hasattr(val, "__shellsy_evaluatable__"):
-                    val = val()
-                else:
-                    raise ArgumentError(
-                        (
-                            f"Argument {val!r} of type {type(val)!r}"
-                            f" invalid for param {param}"
-                        ),
-                        args.string,
-                        pos,
-                        text,
-                    )
-            if param.type not in (_empty, Any) and not type_match(val, param.type)[0]:
-                raise ArgumentError(
-                    f"Argument {val!r} invalid for param {param}",
-                    args.string,
-                    pos,
-                    text,
-                )
-            final_args[param.name] = val
+            if (validate := validators[idx]) is not None:
+                try:
+                    val = validate(val)
+                except TypeError:
+                    raise self._invalid(idx, val, args, pos, raw) from None
+            final_args[names[idx]] = val
+            bound |= 1 << idx
+
+        if missing := plan.required & ~bound:
+            param = plan.params[(missing & -missing).bit_length() - 1]
+            raise ArgumentError(
+                f"missing argument for {param}", args.string, 0, args.string
+            )
         return final_args
 
+    def _invalid(
+        self, idx: int, val: Any, args: S_Arguments, pos: int, raw: str
+    ) -> ArgumentError:
+        return ArgumentError(
+            (
+                f"Argument {val!r} of type {type(val)!r}"
+                f" invalid for param {self.plan.params[idx]}"
+            ),
+            args.string,
+            pos,
+            raw,
+        )
+
     def __str__(self):
         return f"_({', '.join(map(str, self.params))})"
 
 
+class DispatchIndex:
+    """
+    Selects the overloads of a command which may bind a call, from it's
+    positional arity, keyword names, `S_Word` markers and leading argument
+    types. The candidates of each call shape are computed once, so most
+    calls bind a single overload.
+    """
+
+    LEADING = 2
+    commands: "tuple[Command]"
+    width: int
+
+    def __init__(self, commands: "list[Command]", cache_size: int = 256):
+        """
+        :param commands: The command and it's dispatches, in order
+        :param cache_size: The number of call shapes remembered
+        """
+        self.commands = tuple(commands)
+        self.width = self.LEADING
+        for cmd in self.commands:
+            plan = cmd.params.plan
+            for order in (plan.positional, plan.piped):
+                for pos, idx in enumerate(order):
+                    if _is_marker(plan.params[idx].type):
+                        self.width = max(self.width, pos + 1)
+        self.shapes = LRUCache(cache_size)
+
+    def candidates(
+        self, args: S_Arguments, stream: Any = _empty
+    ) -> "tuple[Command]":
+        """
+        :returns: The overloads which may bind args, the others surely fail
+        """
+        shape = (
+            stream is not _empty,
+            len(args.args),
+            tuple(key for key, _ in args.kwargs),
+            tuple(
+                val if type(val) is S_Word else type(val)
+                for val, _ in args.args[: self.width]
+            ),
+        )
+        if (found := self.shapes.get(shape)) is None:
+            found = tuple(
+                cmd
+                for cmd in self.commands
+                if _may_bind(cmd.params.plan, *shape)
+            )
+            self.shapes.set(shape, found)
+        return found
+
+
+def _is_marker(spec: Any) -> bool:
+    return (
+        isinstance(spec, tuple)
+        and len(spec) > 0
+        and all(type(s) is S_Word for s in spec)
+    )
+
+
+def _may_bind(
+    plan: BindingPlan, piped: bool, count: int, keys: tuple, leading: tuple
+) -> bool:
+    if piped and plan.stream < 0:
+        return False
+    order = plan.piped if piped else plan.positional
+    if count > len(order):
+        return False
+    bound = 1 << plan.stream if piped else 0
+    for idx in order[:count]:
+        bound |= 1 << idx
+    for key in keys:
+        idx = plan.index.get(key)
+        if idx is None or bound >> idx & 1:
+            return False
+        bound |= 1 << idx
+    if plan.required & ~bound:
+        return False
+    for kind, idx in zip(leading, order):
+        param = plan.params[idx]
+        if param.default is not _empty:
+            # the value may equal the default, which always binds
+            continue
+        if _is_marker(param.type):
+            if not any(kind is word for word in param.type):
+                return False
+        elif (types := annotation_classes(param.type)) is not None:
+            if not issubclass(S_Word if type(kind) is S_Word else kind, types):
+                return False
+    return True
+
+
 class Command:
     """
-    Holds a command instance and all it's dispatches
+    Holds a command instance and all it's dispatches, `async def` functions
+    return a coroutine when called, which `S_Interpreter.aeval` awaits.
+
+    Options can be passed by calling it before decorating, as in
+    `@Command(cpu_bound=True)`, cpu bound commands run in a worker process
+    of `shellsy.jobs.process_pool`, so their arguments and results should
+    pickle. `@Command(cache=128, ttl=60)` memoizes up to 128 results of the
+    command for a minute, keyed by it's bound arguments, and
+    `@Command(persist=True)` stores them on disk across sessions, keyed by
+    the size and modification time of path arguments, or their content with
+    `hash_files=True`.
     """
     params: CommandParameters
     dispatches: "list[Command]"
     __func__: Callable
-    help: CommandHelp
     name: str
     signature: Signature
-
-    def __init__(self, func: Callable, shell: "Optional[Shell]" = None):
+    cpu_bound: bool
+    cache: Optional[LRUCache]
+    persist: bool
+    hash_files: bool
+
+    def __new__(cls, func: Callable = None, *args, **options):
+        if func is None:
+            return lambda func: cls(func, *args, **options)
+        return super().__new__(cls)
+
+    def __init__(
+        self,
+        func: Callable,
+        shell: "Optional[Shell]" = None,
+        *,
+        cpu_bound: bool = False,
+        cache: int = 0,
+        ttl: Optional[float] = None,
+        persist: bool = False,
+        hash_files: bool = False,
+    ):
         """
         Creates, initializes the Command with the given function.
         :param func: THe function to construct command from
         :param shell: optionally specify the shell(when it is a method of a
         shell, the shell does this for You)
+        :param cpu_bound: Run the command in a worker process
+        :param cache: The number of results to memoize, `0` for none
+        :param ttl: The number of seconds results are memoized
+        :param persist: Store the results on disk
+        :param hash_files: Key persisted results by the content of path
+        arguments, not only their size and modification time
         """
-        from inspect import signature
-
-        self.params = CommandParameters.from_function(func)
+        self.signature = signature(func)
+        self.params = CommandParameters.from_signature(self.signature)
         self.__func__ = func
         self.name = func.__name__
-        self.signature = signature(func)
-        self.help = CommandHelp.from_command(self)
+        self._help = None
         self.dispatches = []
         self.shell = shell
+        self.parent = None
+        self.cpu_bound = cpu_bound
+        self.cache = LRUCache(cache, ttl) if cache else None
+        self.persist = persist
+        self.hash_files = hash_files
+        self.dispatch_index = None
+
+    @property
+    def help(self) -> CommandHelp:
+        """
+        The command help, parsed from it's docstring when first needed
+        """
+        if self._help is None:
+            self._help = CommandHelp.from_command(self)
+        return self._help
 
-    def __call__(self, args: "S_Arguments"):
+    def __call__(self, args: "S_Arguments", stream: Any = _empty):
         """
         Calls the Command with the given arguments
         :param args: THe arguments
+        :param stream: The piped output of the previous command, if any
         :raises RuntimeError: raised if the parent shell not yet set
         """
         if self.shell is None:
             raise RuntimeError(self.name, "was not attributed a shell")
+        cmd, kwargs = self.select(args, stream)
+        return cmd.invoke(self.shell, kwargs)
+
+    def select(
+        self, args: "S_Arguments", stream: Any = _empty
+    ) -> "tuple[Command, dict[str, Any]]":
+        """
+        Binds the arguments to the command or the first dispatch they match
+        :param args: THe arguments
+        :param stream: The piped output of the previous command, if any
+        :returns: The matching command and the bound arguments
+        :raises NoSuchCommand: No dispatch matches the arguments
+        """
         if len(self.dispatches) == 0:
-            args = self.params.bind(args)
-            return self.__func__(self.shell, **args)
-        else:
-            errors = []
-            for cmd in [self] + self.dispatches:
-                try:
-                    args = cmd.params.bind(args)
-                except ArgumentError as e:
-                    errors.append(e)
-                    continue
-                else:
-                    return cmd.__func__(self.shell, **args)
+            return self, self.params.bind(args, stream)
+        for cmd in self.dispatch_index.candidates(args, stream):
+            try:
+                return cmd, cmd.params.bind(args, stream)
+            except ArgumentError:
+                continue
+        errors = []
+        for cmd in [self] + self.dispatches:
+            try:
+                return cmd, cmd.params.bind(args, stream)
+            except ArgumentError as e:
+                errors.append(e)
+        raise NoSuchCommand(
+            "No dispatch matches arguments\n" + "\n - ".join(map(str, errors))
+        )
+
+    def broadcast(self, args: "S_Arguments", stream: Any = _empty) -> list:
+        """
+        Calls the command for each element of it's `S_Broadcast` arguments,
+        which are zipped. The arguments are bound once with the first
+        elements, the next ones are only checked by the parameter validator.
+        :param args: THe arguments
+        :param stream: The piped output of the previous command, if any
+        :returns: The list of results
+        """
+        if self.shell is None:
+            raise RuntimeError(self.name, "was not attributed a shell")
+        spots = [
+            (idx, None, val, loc)
+            for idx, (val, loc) in enumerate(args.args)
+            if type(val) is S_Broadcast
+        ] + [
+            (None, key, val, loc)
+            for key, (val, loc) in args.kwargs.items()
+            if type(val) is S_Broadcast
+        ]
+        columns = []
+        for _, _, val, (pos, raw) in spots:
+            try:
+                columns.append(val.items())
+            except TypeError as e:
+                raise ArgumentError(str(e), args.string, pos, raw) from None
+        if len(set(map(len, columns))) > 1:
+            _, _, _, (pos, raw) = spots[-1]
+            raise ArgumentError(
+                "broadcast lists of different lengths", args.string, pos, raw
+            )
+        if not columns[0]:
+            return []
+        first = S_Arguments(list(args.args), dict(args.kwargs), args.string)
+        for (idx, key, _, loc), column in zip(spots, columns):
+            if key is None:
+                first.args[idx] = (column[0], loc)
             else:
-                raise NoSuchCommand(
-                    "No dispatch matches arguments\n" + "\n - ".join(map(str, errors))
-                )
+                first.kwargs[key] = (column[0], loc)
+        cmd, kwargs = self.select(first, stream)
+        plan = cmd.params.plan
+        order = plan.positional if stream is _empty else plan.piped
+        targets = []
+        for (idx, key, _, loc), column in zip(spots, columns):
+            param = order[idx] if key is None else plan.index[key[0]]
+            targets.append(
+                (plan.names[param], plan.validators[param], column, loc)
+            )
+
+        def call(i: int):
+            values = dict(kwargs)
+            for name, validate, column, (pos, raw) in targets:
+                val = column[i]
+                if validate is not None:
+                    try:
+                        val = validate(val)
+                    except TypeError:
+                        raise cmd.params._invalid(
+                            plan.index[name], val, args, pos, raw
+                        ) from None
+                values[name] = val
+            return cmd.invoke(self.shell, values)
+
+        if any(val.threaded for _, _, val, _ in spots):
+            from .jobs import thread_pool
+
+            results = list(thread_pool().map(call, range(len(columns[0]))))
+        else:
+            results = [call(i) for i in range(len(columns[0]))]
+        if any(map(isawaitable, results)):
+            return _gather(results)
+        return results
+
+    def invoke(self, shell: "Shell", kwargs: dict[str, Any]):
+        """
+        Calls the command function with already bound arguments, in a worker
+        process for cpu bound commands.
+
+        :param shell: The shell passed to the function
+        :param kwargs: The bound arguments
+        """
+        if self.cache is None:
+            return self._persisted(shell, kwargs)
+        try:
+            key = (self.name, canonical_key(kwargs))
+        except TypeError:
+            return self._persisted(shell, kwargs)
+        if (val := self.cache.get(key, _empty)) is not _empty:
+            return _fresh_literal(val)
+        val = self._persisted(shell, kwargs)
+        if isawaitable(val):
+            return self._store(self._memoize, key, val)
+        elif not isinstance(val, Iterator):
+            self._memoize(key, val)
+        return val
+
+    def _memoize(self, key, val):
+        # a copy is kept, callers may mutate the returned list, dict or set
+        self.cache.set(key, _fresh_literal(val))
+
+    def _persisted(self, shell: "Shell", kwargs: dict[str, Any]):
+        if not self.persist:
+            return self._call(shell, kwargs)
+        cache = result_cache()
+        try:
+            key = cache.key(
+                f"{shell.path}.{self.name}" if shell.path else self.name,
+                self.__func__,
+                kwargs,
+                self.hash_files,
+            )
+        except TypeError:
+            return self._call(shell, kwargs)
+        if (val := cache.load(key)) is not None:
+            return val
+        val = self._call(shell, kwargs)
+        if isawaitable(val):
+            return self._store(cache.store, key, val)
+        elif not isinstance(val, Iterator):
+            cache.store(key, val)
+        return val
+
+    @staticmethod
+    async def _store(store: Callable, key, awaitable):
+        val = await awaitable
+        if not isinstance(val, Iterator):
+            store(key, val)
+        return val
+
+    def _call(self, shell: "Shell", kwargs: dict[str, Any]):
+        if not self.cpu_bound:
+            return self.__func__(shell, **kwargs)
+        from .jobs import process_pool, call_in_worker
+        import asyncio
+
+        kwargs = {
+            k: list(v) if isinstance(v, Iterator) else v
+            for k, v in kwargs.items()
+        }
+        future = process_pool().submit(call_in_worker, self, kwargs)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return future.result()
+        else:
+            return asyncio.wrap_future(future)
+
+    def __reduce__(self):
+        # commands are pickled by reference, to their shell class attribute
+        if self.parent is not None:
+            return (
+                _resolve_dispatch,
+                (self.parent, self.parent.dispatches.index(self)),
+            )
+        qualname = self.__func__.__qualname__.rsplit(".", 1)
+        return (
+            _resolve_command,
+            (self.__func__.__module__, qualname[:-1], self.name),
+        )
 
     def __set_name__(self, cls, name):
         self.name = name
 
-    def dispatch(self, func: Callable):
+    def bound_to(self, shell: "Shell") -> "Command":
+        """
+        Copies the command for shell, the copy sharing it's parameters,
+        dispatches and cache, so shells of different interpreters do not
+        overwrite each other's.
+
+        :param shell: The shell the copy is called with
+        :returns: The bound copy
+        """
+        bound = object.__new__(Command)
+        bound.__dict__.update(self.__dict__)
+        bound.shell = shell
+        return bound
+
+    def dispatch(self, func: Callable = None, *, cpu_bound: bool = False):
         """
         Decorator to create a dispatch of the default command function, called
         if arguments fail from binding.
         :param func: THe function to add
+        :param cpu_bound: Run the dispatch in a worker process, not inherited
+        from the command
         """
-        self.dispatches.append(Command(func))
+        if func is None:
+            return lambda func: self.dispatch(func, cpu_bound=cpu_bound)
+        cmd = Command(
+            func,
+            cpu_bound=cpu_bound,
+            persist=self.persist,
+            hash_files=self.hash_files,
+        )
+        cmd.cache = self.cache
+        cmd.parent = self
+        self.dispatches.append(cmd)
+        self.dispatch_index = DispatchIndex([self] + self.dispatches)
         return func
 
 
+async def _gather(results: list) -> list:
+    import asyncio
+
+    async def wait(val):
+        return await val if isawaitable(val) else val
+
+    return list(await asyncio.gather(*map(wait, results)))
+
+
+def _resolve_owner(module: str, owner: list[str]):
+    from importlib import import_module
+
+    obj = import_module(module)
+    for name in owner:
+        obj = getattr(obj, name)
+    return obj
+
+
+def _resolve_command(module: str, owner: list[str], name: str) -> Command:
+    return getattr(_resolve_owner(module, owner), name)
+
+
+def _resolve_dispatch(parent: Command, index: int) -> Command:
+    return parent.dispatches[index]
+
+
 class Shell:
     """
     The base of shelsy, a shell instance holds subshells, and commands,
@@ -278,14 +784,31 @@ class Shell:
     name: str
     parent: "Shell"
     shellsy: "Shell"
+    path: str = ""
+    commands: dict[str, Command]
+    subshells: "dict[str, Shell]"
+    _commands: dict[str, Command] = {}
+    _subshells: "dict[str, type[Shell]]" = {}
 
     def __init_subclass__(cls):
         if not hasattr(cls, "name"):
             cls.name = cls.__name__.lower()
-        if not hasattr(cls, "subshells"):
-            cls.subshells = {}
-        if not hasattr(cls, "commands"):
-            cls.commands = {}
+        attrs = {}
+        for klass in reversed(cls.__mro__):
+            attrs.update(vars(klass))
+        cls._commands = {}
+        cls._subshells = {}
+        for attr in sorted(attrs):
+            val = attrs[attr]
+            if attr.startswith("__") and attr != "__entrypoint__":
+                continue
+            name = attr
+            if attr[0] == "_" and attr != "__entrypoint__":
+                name = attr[1:]
+            if isinstance(val, Command):
+                cls._commands[name] = val
+            elif isinstance(val, type) and issubclass(val, Shell):
+                cls._subshells[name] = val
 
     def __init__(self, parent: "Shell"):
         """
@@ -294,26 +817,18 @@ class Shell:
         """
         self.parent = parent
         self.shellsy = parent.shellsy
-
-        for attr in dir(self):
-            if attr == "__entrypoint__":
-                cmd = getattr(self, attr)
-                cmd.shell = self
-                self.commands["__entrypoint__"] = cmd
-            if attr.startswith("__"):
-                continue
-            try:
-                if isinstance(cmd := getattr(self, attr), Command):
-                    cmd.shell = self
-                    if attr[0] == "_":
-                        attr = attr[1:]
-                    self.commands[attr] = cmd
-                elif issubclass(subcls := getattr(self, attr), Shell):
-                    if attr[0] == "_":
-                        attr = attr[1:]
-                    self.subshells[attr] = subcls(self)
-            except (AttributeError, TypeError):
-                pass
+        self._bind()
+
+    def _bind(self):
+        # binds the commands registered with the class, subshells are
+        # instantiated when first used
+        self.commands = {
+            name: cmd.bound_to(self) for name, cmd in self._commands.items()
+        }
+        self.subshells = {
+            name: LazyShell(subcls, self, name)
+            for name, subcls in self._subshells.items()
+        }
 
     def get_interpreter(self):
         """
@@ -331,6 +846,8 @@ class Shell:
         self._interpreter = interp
 
     def get_possible_subcommands(self):
+        if self is self.shellsy:
+            return list(self.command_paths)
         possible = list(self.commands)
         for sub, val in self.subshells.items():
             possible.extend([sub + "." + x for x in val.get_possible_subcommands()])
@@ -366,7 +883,7 @@ class Shell:
         :param name: THe package name to import
         :param as_: The subshell name to assign
 
-        :returns: The plugin shell instance
+        :returns: The plugin shell, instantiated when first used
 
         :raises ShellNotFound: THe shell could not be imported
         """
@@ -378,7 +895,88 @@ class Shell:
         except AttributeError as e:
             raise ShellNotFound(name + " has no shell: " + str(e)) from e
         else:
-            from shellsy.lexer import for_shell
-            shell = plugin_shell(parent=self)
-            self.subshells[as_ or name.split(".", 1)[0]] = shell
-            return shell
+            as_ = as_ or name.split(".", 1)[0]
+            self.shellsy.plugins.add(name)
+            return self.add_subshell(as_, LazyShell(plugin_shell, self, as_))
+
+    def add_subshell(self, name: str, shell: "Shell | LazyShell") -> "Shell":
+        """
+        Adds shell as a subshell, and it's commands to the shellsy command
+        paths.
+
+        :param name: The subshell name
+        :param shell: The shell instance
+
+        :returns: The shell
+        """
+        self.subshells[name] = shell
+        path = self.path + "." + name if self.path else name
+        self.shellsy.index_shell(shell, path)
+        return shell
+
+
+class LazyShell:
+    """
+    Stands for a subshell not yet instantiated, it knows the commands and
+    subshells registered with it's class, enough for completion and the
+    command paths, and instantiates the shell when a command is first
+    fetched from it.
+    """
+    cls: type[Shell]
+    parent: "Shell | LazyShell"
+    name: str
+
+    def __init__(
+        self, cls: type[Shell], parent: "Shell | LazyShell", name: str
+    ):
+        """
+        :param cls: The subshell class
+        :param parent: The parent shell, or it's stub
+        :param name: The subshell name in parent
+        """
+        self.cls = cls
+        self.parent = parent
+        self.name = name
+        self.shellsy = parent.shellsy
+        self.commands = cls._commands
+        self.subshells = {
+            sub: LazyShell(subcls, self, sub)
+            for sub, subcls in cls._subshells.items()
+        }
+
+    @property
+    def path(self) -> str:
+        if self.parent.path:
+            return self.parent.path + "." + self.name
+        return self.name
+
+    def load(self) -> Shell:
+        """
+        Instantiates the shell, and replaces this stub in the parent
+        subshells.
+
+        :returns: The shell instance
+        """
+        parent = self.parent
+        if isinstance(parent, LazyShell):
+            parent = parent.load()
+        shell = parent.subshells.get(self.name)
+        if not isinstance(shell, Shell):
+            shell = self.cls(parent=parent)
+            shell.path = self.path
+            parent.subshells[self.name] = shell
+        return shell
+
+    def get_command(self, cmd: str):
+        return self.load().get_command(cmd)
+
+    def get_possible_subcommands(self):
+        possible = list(self.commands)
+        for sub, val in self.subshells.items():
+            possible.extend(
+                sub + "." + x for x in val.get_possible_subcommands()
+            )
+        return possible
+
+    def __repr__(self):
+        return f"<LazyShell {self.cls.__qualname__} at {self.path!r}>"
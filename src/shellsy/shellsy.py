@@ -40,26 +40,16 @@ class Shellsy(Shell):
     This is free software, and you are welcome to redistribute it
     under certain conditions; type `c_` for details."""
     _interpreter = None
+    command_paths: dict[str, Command]
+    generation: int
 
     def __init__(self):
         self.shellsy = self
-        for attr in dir(self):
-            if attr == "__entrypoint__":
-                self.commands["__entrypoint__"] = getattr(self, attr)
-            if attr.startswith("__"):
-                continue
-            try:
-                if isinstance(cmd := getattr(self, attr), Command):
-                    cmd.shell = self
-                    if attr[0] == "_":
-                        attr = attr[1:]
-                    self.commands[attr] = cmd
-                elif issubclass(subcls := getattr(self, attr), Shell):
-                    if attr[0] == "_":
-                        attr = attr[1:]
-                    self.subshells[attr] = subcls(self)
-            except (AttributeError, TypeError):
-                pass
+        self.plugins = set()
+        self.command_paths = {}
+        self.generation = 0
+        self._bind()
+        self.index_shell(self, "")
 
     def get_interpreter(self):
         """
@@ -68,6 +58,68 @@ class Shellsy(Shell):
         """
         return self._interpreter
 
+    def index_shell(self, shell: Shell, path: str):
+        """
+        Maps the commands of shell and it's subshells in `command_paths`
+        under the dotted path, replacing the commands previously there, and
+        increments `generation`, which caches depending on the available
+        commands check.
+
+        :param shell: The shell to index
+        :param path: The shell dotted path, empty for shellsy itself
+        """
+        if path:
+            prefix = path + "."
+            stale = [
+                k
+                for k in self.command_paths
+                if k == path or k.startswith(prefix)
+            ]
+            for key in stale:
+                del self.command_paths[key]
+        self._index(shell, path)
+        self.generation += 1
+
+    def _index(self, shell: Shell, path: str):
+        if isinstance(shell, Shell):
+            shell.path = path
+        prefix = path + "." if path else ""
+        for name, cmd in shell.commands.items():
+            self.command_paths[prefix + name] = cmd
+        for name, sub in shell.subshells.items():
+            self._index(sub, prefix + name)
+
+    def get_command(self, cmd: str):
+        """
+        Gets a command from it's dotted path, from `command_paths`,
+        instantiating the shell holding it if needed.
+        :param cmd: THe command path
+        :raises NoSuchCommand: The command name does not exist
+        """
+        path = cmd
+        if (command := self.command_paths.get(path)) is None:
+            path = cmd + ".__entrypoint__" if cmd else "__entrypoint__"
+            if (command := self.command_paths.get(path)) is None:
+                return super().get_command(cmd)
+        if command.shell is None or command.shell.shellsy is not self:
+            shell_path, _, name = path.rpartition(".")
+            command = self.shell_at(shell_path).commands[name]
+            self.command_paths[path] = command
+        return command
+
+    def shell_at(self, path: str) -> Shell:
+        """
+        Gets the shell at the dotted path, instantiating it if needed.
+        :param path: The shell path, empty for shellsy itself
+        :raises KeyError: There is no such subshell
+        """
+        shell = self
+        for name in path.split(".") if path else ():
+            shell = shell.subshells[name]
+            if isinstance(shell, LazyShell):
+                shell = shell.load()
+        return shell
+
     @Command
     def cd(shell, path: Path = None):
         """
@@ -131,19 +183,27 @@ class Shellsy(Shell):
     @Command
     def dir(shell, pattern: str | Path = "*"):
         """
-        The command utility to change directory
-        :param path: The new path to assign
+        Lists the paths in the working directory matching pattern
+        :param pattern: The glob pattern to match
 
-        :returns: The new working directory
+        :returns: A generator of the matching paths, consumed lazily when
+        piped
         """
-        from rich.markdown import Markdown
-        from rich import print
+        return Path(".").resolve().glob(str(pattern))
 
-        txt = ""
-        for x in Path(".").resolve().glob(str(pattern)):
-            txt += f"- {txt}\n"
-        print(Markdown(txt))
-        return tuple(Path(".").resolve().glob(str(pattern)))
+    @Command
+    def filter(shell, items: S_Stream, pattern: str = "*"):
+        """
+        Lazily filters the piped items, as in `dir * | filter *.py`
+        :param items: The items to filter
+        :param pattern: The glob pattern the items should match
+
+        :returns: A generator of the matching items
+        """
+        from fnmatch import fnmatch
+
+        pattern = str(pattern)
+        return (x for x in items if fnmatch(str(x), pattern))
 
     @Command
     def echo(shell, val):
@@ -166,6 +226,52 @@ class Shellsy(Shell):
         """
         return print(repr(val))
 
+    @Command
+    async def gather(shell, lines: list):
+        """
+        Evaluates the command lines concurrently, so the asynchronous
+        commands among them overlap their waits
+        :param lines: The list of command lines to run
+
+        :returns: The list of the lines results
+        """
+        return await shell.get_interpreter().agather(*map(str, lines))
+
+    @Command
+    def jobs(shell):
+        """
+        Lists the background jobs, started by ending a command with `&`
+
+        :returns: The list of jobs
+        """
+        return list(shell.get_interpreter().jobs)
+
+    @Command
+    def wait(shell):
+        """
+        Waits for all the background jobs to finish, and removes them from
+        the jobs list
+
+        :returns: The list of the jobs results
+        """
+        return shell.get_interpreter().jobs.wait()
+
+    @Command
+    def fg(shell, job: int = None):
+        """
+        Brings a background job to the foreground, waiting for it
+        :param job: The job number, defaults to the last job
+
+        :returns: The job result
+        """
+        try:
+            job = shell.get_interpreter().jobs.pop(job)
+        except KeyError:
+            raise S_Exception(
+                "No such job", f"fg {job}", 3, "" if job is None else str(job)
+            )
+        return job.result()
+
     @Command
     def var(shell, var: S_Variable, val=None):
         """
@@ -390,8 +496,45 @@ class Shellsy(Shell):
             else:
                 rich.print(command.help.markdown())
 
-    class json(Shell):
+    class cache(Shell):
         @Command
+        def stats(shell):
+            """
+            Lists the memoized commands caches
+            :returns: A dictionnary mapping the command paths to their cache
+            hits, misses, size and maxsize
+            """
+            return {
+                path: command.cache.info()
+                for path, command in shell.shellsy.command_paths.items()
+                if command.cache is not None
+            }
+
+        @Command
+        def clear(shell, command: str = None):
+            """
+            Flushes the memoized results of command, or of all commands
+            :param command: The command path
+            """
+            if command is not None:
+                try:
+                    commands = [shell.shellsy.get_command(command)]
+                except NoSuchCommand:
+                    raise S_Exception(
+                        f"No such command `{command}`, `cache.stats` lists"
+                        " the memoized commands",
+                        "cache.clear " + command,
+                        12,
+                        command,
+                    )
+            else:
+                commands = shell.shellsy.command_paths.values()
+            for cmd in commands:
+                if cmd.cache is not None:
+                    cmd.cache.clear()
+
+    class json(Shell):
+        @Command(persist=True)
         def load(shell, file: Path, var: S_Variable = None):
             """\
             Deserialize a JSON formatted stream to a Python object.
@@ -427,17 +570,24 @@ class Shellsy(Shell):
                 return data
 
         @Command
-        def dump(shell, data: Any, file: Path = None, indent: int = None):
+        def dump(
+            shell, data: S_Stream, file: Path = None, indent: int = None
+        ):
             """
             Serialize a Python object to a JSON formatted string.
 
-            :param obj: The Python object to convert to a JSON string.
+            :param obj: The Python object to convert to a JSON string, piped
+            iterators are dumped as lists.
             :param indent: specifies the number of spaces for indentation.
 
             :returns: A JSON formatted string representation of the object.
             """
+            from collections.abc import Iterator
+
+            if isinstance(data, Iterator):
+                data = list(data)
             try:
-                text = json.dumps(data, indent=indent)
+                text = json.dumps(data, indent=indent, default=str)
             except Exception as e:
                 log.error(e)
             else:
@@ -449,14 +599,14 @@ class Shellsy(Shell):
                 return text
 
     class yaml(Shell):
-        @Command
+        @Command(persist=True)
         def load(shell, file: Path, var: S_Variable = None):
             import yaml
             if not file.exists():
                 return log.error("file does not exist")
             text = file.read_text()
             try:
-                data = yaml.safe_loads(text)
+                data = yaml.safe_load(text)
             except Exception as e:
                 log.error(e)
             else:
@@ -0,0 +1,178 @@
+"""
+Shellsy: An extensible shell program designed for ease of use and flexibility.
+
+This module compiles parameter annotations into specialized checks, used
+when binding command arguments.
+
+Copyright (C) 2024 ken-morel
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from abc import ABCMeta
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
+from inspect import _empty
+from itertools import repeat
+from pyoload import Checks
+from pyoload import Values
+from pyoload import type_match
+from types import GenericAlias
+from types import UnionType
+from typing import Any
+from typing import Callable
+from typing import Union
+from typing import get_args
+from typing import get_origin
+
+Validator = Callable[[Any], bool]
+
+_validators: dict[Any, Validator] = {}
+
+
+def compile_validator(spec: Any) -> Validator:
+    """
+    Compiles the annotation spec into a function checking values against
+    it, as `pyoload.type_match` does. Plain classes and unions of them are
+    checked with a single isinstance, which result is cached per value
+    type, parameterized generics check each element.
+
+    :param spec: The annotation
+    :returns: A function taking a value and returning if it matches
+    """
+    try:
+        return _validators[spec]
+    except KeyError:
+        pass
+    except TypeError:
+        return _compile(spec)
+    validator = _validators[spec] = _compile(spec)
+    return validator
+
+
+def validate(val: Any, spec: Any) -> bool:
+    """
+    Checks val against the annotation spec, compiling it on first use.
+    """
+    return compile_validator(spec)(val)
+
+
+def _compile(spec: Any) -> Validator:
+    if spec is Any or spec is _empty or spec is None:
+        return _accept
+    if isinstance(spec, tuple) and spec:
+        # as annotated `S_Word["as"]`, checked against each word
+        if all(_is_class(s) for s in spec):
+            return _type_check(spec)
+        return _instance_check(spec)
+    if isinstance(spec, (Values, Checks)):
+        return lambda val: type_match(val, spec)[0]
+    if (classes := annotation_classes(spec)) is not None:
+        return _type_check(classes)
+    origin = get_origin(spec)
+    if origin in (Union, UnionType):
+        members = _flatten(spec)
+        classes = tuple(m for m in members if _is_class(m))
+        checks = [_compile(m) for m in members if not _is_class(m)]
+        if classes:
+            checks.insert(0, _type_check(classes))
+        return _nullable(lambda val: any(check(val) for check in checks))
+    generic = origin in (Iterable, Iterator, Mapping)
+    if isinstance(spec, GenericAlias) or generic:
+        return _nullable(_generic_check(origin, get_args(spec)))
+    try:
+        isinstance(None, spec)
+    except TypeError:
+        return lambda val: type_match(val, spec)[0]
+    return _instance_check(spec)
+
+
+def _accept(val: Any) -> bool:
+    return True
+
+
+def _is_class(spec: Any) -> bool:
+    # the metaclasses whose isinstance depends only on the value type
+    return type(spec) is type or type(spec) is ABCMeta
+
+
+def _flatten(spec: Any) -> tuple:
+    members = []
+    for arg in get_args(spec):
+        if get_origin(arg) in (Union, UnionType):
+            members.extend(_flatten(arg))
+        else:
+            members.append(arg)
+    return tuple(members)
+
+
+def _type_check(types: tuple) -> Validator:
+    cache = {}
+
+    def check(val: Any) -> bool:
+        try:
+            return cache[type(val)]
+        except KeyError:
+            match = cache[type(val)] = isinstance(val, types)
+            return match
+
+    return check
+
+
+def _instance_check(spec: Any) -> Validator:
+    return lambda val: isinstance(val, spec)
+
+
+def _nullable(check: Validator) -> Validator:
+    # pyoload lets None through annotations isinstance does not support
+    return lambda val: val is None or check(val)
+
+
+def _generic_check(origin: type, args: tuple) -> Validator:
+    if origin in (dict, Mapping):
+        key = compile_validator(args[0]) if args else _accept
+        value = compile_validator(args[1]) if len(args) == 2 else _accept
+        return lambda val: isinstance(val, origin) and all(
+            key(k) and value(v) for k, v in val.items()
+        )
+    if origin is tuple and len(args) > 1 and args[-1] is not Ellipsis:
+        items = tuple(map(compile_validator, args))
+        return lambda val: isinstance(val, tuple) and all(
+            check(v) for check, v in zip(items, val)
+        )
+    item = compile_validator(args[0]) if args else _accept
+    if item is _accept or origin is Iterator:
+        # iterators are not consumed to check their items
+        return lambda val: isinstance(val, origin)
+    if (types := annotation_classes(args[0])) is not None:
+        return lambda val: isinstance(val, origin) and all(
+            map(isinstance, val, repeat(types))
+        )
+    return lambda val: isinstance(val, origin) and all(map(item, val))
+
+
+def annotation_classes(spec: Any) -> "tuple | None":
+    """
+    :returns: The tuple of classes spec checks values against if it is a
+    class or union of classes, which match depends only on the value type,
+    else `None`
+    """
+    if _is_class(spec):
+        return (spec,)
+    if get_origin(spec) in (Union, UnionType):
+        members = _flatten(spec)
+        if all(map(_is_class, members)):
+            return members
+    return None
@@ -0,0 +1,70 @@
+import os
+import time
+
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from shellsy import cache
+from shellsy.cache import LRUCache
+from shellsy.cache import ResultCache
+from shellsy.cache import canonical_key
+from shellsy.interpreter import S_Interpreter as Interp
+
+
+def test_lru_ttl():
+    cache = LRUCache(2, ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.info() == {"hits": 1, "misses": 1, "size": 0, "maxsize": 2}
+
+
+def test_canonical_key():
+    assert canonical_key({"a": [1, 2]}) == canonical_key({"a": [1, 2]})
+    assert canonical_key(1) != canonical_key(True) != canonical_key(Decimal(1))
+    assert canonical_key([1]) != canonical_key((1,))
+    assert canonical_key(Path("x")) == canonical_key(Path("x").absolute())
+    assert hash(canonical_key(slice(1, [2])))
+    with pytest.raises(TypeError):
+        canonical_key([iter([])])
+
+
+def test_result_cache(tmp_path, monkeypatch):
+    results = ResultCache(tmp_path / "results")
+    monkeypatch.setattr(cache, "_result_cache", results)
+    inter = Interp()
+    data = tmp_path / "data.json"
+    data.write_text("[1, 2]")
+    loads = []
+    monkeypatch.setattr(
+        "json.loads", lambda text: loads.append(text) or [1, 2]
+    )
+
+    line = f"json.load /{data.as_posix()}/"
+    assert inter.eval(line) == [1, 2]
+    assert inter.eval(line) == [1, 2]
+    assert len(loads) == 1
+
+    data.write_text("[1, 2, 3]")
+    os.utime(data, ns=(0, 0))
+    assert inter.eval(line) == [1, 2]
+    assert len(loads) == 2
+
+
+def test_result_cache_key(tmp_path):
+    results = ResultCache(tmp_path / "results")
+
+    def command(source):
+        namespace = {}
+        exec(compile(source, "plugin.py", "exec"), namespace)
+        return namespace["run"]
+
+    one = command("def run(shell):\n    return 1\n")
+    key = results.key("plugin.run", one, {"a": 1})
+    assert key == results.key("plugin.run", one, {"a": 1})
+    assert key != results.key("other.run", one, {"a": 1})
+    two = command("def run(shell):\n    return 2\n")
+    assert key != results.key("plugin.run", two, {"a": 1})
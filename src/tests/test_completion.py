@@ -0,0 +1,56 @@
+import os
+
+from shellsy.completion import CompletionIndex
+from shellsy.completion import DirectoryCache
+from shellsy.shell import Command
+from shellsy.shell import Shell
+from shellsy.shellsy import Shellsy
+
+
+def test_complete_ranks_prefix_then_subsequence():
+    index = CompletionIndex(["echo", "eval", "exit", "json.load", "yaml.load"])
+    assert index.complete("e") == ["echo", "eval", "exit"]
+    assert index.complete("o") == ["echo", "json.load", "yaml.load"]
+    assert index.complete("ld") == ["json.load", "yaml.load"]
+    assert index.complete("lod", limit=1) == ["json.load"]
+    assert index.complete("xyz") == []
+    index.discard("echo")
+    assert index.complete("ec") == []
+    assert index.prefixed("ec") == set()
+    assert index.prefixed("ev") == {"eval"}
+    assert isinstance(index.prefixed("ev"), frozenset)
+
+
+def test_refresh_follows_imports():
+    root = Shellsy()
+    index = CompletionIndex()
+    assert index.refresh(root)
+    assert not index.refresh(root)
+
+    class Tool(Shell):
+        @Command
+        def __entrypoint__(shell):
+            pass
+
+        @Command
+        def frobnicate(shell):
+            pass
+
+    root.add_subshell("tool", Tool(root))
+    assert index.refresh(root)
+    assert index.complete("tool") == ["tool", "tool.frobnicate"]
+    assert "frob" not in index.names
+
+
+def test_directory_cache(tmp_path):
+    for name in ("build", "bench.py", "src"):
+        (tmp_path / name).touch()
+    (tmp_path / "lib").mkdir()
+    dirs = DirectoryCache()
+    assert dirs.complete(tmp_path, "bu") == [("build", False)]
+    assert dirs.complete(tmp_path, "l") == [("lib", True), ("build", False)]
+    listing = dirs.listing(tmp_path)
+    assert dirs.listing(tmp_path) is listing
+    (tmp_path / "bin").touch()
+    os.utime(tmp_path, ns=(0, 0))
+    assert ("bin", False) in dirs.listing(tmp_path)
@@ -0,0 +1,286 @@
+import asyncio
+import os
+import pickle
+import threading
+
+import pytest
+
+from shellsy.exceptions import ShellsyException
+from shellsy.exceptions import StackTrace
+from shellsy.interpreter import S_Interpreter as Interp
+from shellsy.interpreter import S_Scope
+from shellsy.jobs import shutdown_process_pool
+from shellsy.lang import Nil
+from shellsy.lang import S_Stream
+from shellsy.shell import Command
+from shellsy.shell import Shell
+
+
+def test_parse_cache():
+    inter = Interp()
+
+    assert inter.eval("echo 3") == 3
+    assert inter.eval("echo 3") == 3
+    info = inter.parse_cache_info()
+    assert info["hits"] == 1 and info["misses"] == 1
+
+    inter.shell.generation += 1
+    assert inter.eval("echo 3") == 3
+    assert inter.parse_cache_info()["misses"] == 2
+
+    inter.parse_cache_size = 0
+    assert inter.parse_cache_info()["size"] == 0
+
+
+def test_parse_cache_fresh_literals():
+    inter = Interp()
+
+    first = inter.eval("echo [1 2]")
+    first.append(3)
+    assert 3 not in inter.eval("echo [1 2]")
+
+
+def test_nested_literals():
+    inter = Interp()
+
+    assert inter.eval("echo [1 [2 [3]] 'a]']") == [1, [2, [3]], "a]"]
+    assert inter.eval("echo [-a [1 2] -b [-c 3] -d]") == {
+        "a": [1, 2],
+        "b": {"c": 3},
+        "d": Nil,
+    }
+    assert inter.evaluate_literal("[1 [2]]") == [1, [2]]
+
+
+def test_error_locations():
+    inter = Interp()
+
+    with pytest.raises(ShellsyException) as e:
+        inter.eval('echo "abc')
+    assert [(s.xpos, s.file) for s in e.value.stacktrace.stacks] == [
+        ((5, 9), "<argument>"),
+        ((6, 9), "<literal>"),
+    ]
+    with pytest.raises(ShellsyException) as e:
+        inter.eval("echo [-a 1 2]")
+    assert [(s.xpos, s.file) for s in e.value.stacktrace.stacks] == [
+        ((5, 13), "<argument>"),
+        ((11, 13), "<argument>"),
+    ]
+    with pytest.raises(ShellsyException) as e:
+        inter.eval("echo [1 [-a 1 2]]")
+    assert [(s.xpos, s.file) for s in e.value.stacktrace.stacks] == [
+        ((5, 17), "<argument>"),
+        ((8, 17), "<argument>"),
+        ((14, 17), "<argument>"),
+    ]
+    assert inter.eval("echo 1") == 1
+    assert inter.stacktrace.stacks == []
+
+
+def test_pipeline():
+    inter = Interp()
+
+    assert inter.eval("echo [1 2] | json.dump") == "[1, 2]"
+    assert inter.eval("echo ['a.py' 'b.txt'] | filter *.py | json.dump") == (
+        '["a.py"]'
+    )
+    assert inter.eval("echo a|b") == "a|b"
+    with pytest.raises(ShellsyException):
+        inter.eval("echo 1 | echo")
+
+
+def test_async_commands():
+    class sleepy(Shell):
+        @Command
+        async def __entrypoint__(shell, val: int):
+            await asyncio.sleep(0)
+            return val
+
+    inter = Interp()
+    inter.shell.add_subshell("sleepy", sleepy(inter.shell))
+
+    assert inter.eval("sleepy 1") == 1
+    assert inter.eval("sleepy 2 | json.dump") == "2"
+    assert asyncio.run(inter.aeval("sleepy 3")) == 3
+    assert asyncio.run(inter.agather("sleepy 4", "echo 5")) == [4, 5]
+    assert inter.eval("gather ['sleepy 6' 'echo 7']") == [6, 7]
+
+    async def failing():
+        return await asyncio.gather(
+            inter.aeval("sleepy 'a'", StackTrace()),
+            inter.aeval("sleepy 'b'", StackTrace()),
+            return_exceptions=True,
+        )
+
+    errors = asyncio.run(failing())
+    assert errors[0].stacktrace is not errors[1].stacktrace
+    assert [len(e.stacktrace.stacks) for e in errors] == [1, 1]
+    with pytest.raises(ShellsyException) as e:
+        asyncio.run(inter.agather("echo 1", "sleepy 'c'"))
+    assert e.value.stacktrace is not inter.stacktrace
+
+
+def test_background_jobs():
+    inter = Interp()
+    done = []
+    inter.jobs.listeners.append(done.append)
+
+    job = inter.eval("echo 3 &")
+    assert job.result(5) == 3
+    assert inter.eval("jobs") == [job]
+    assert inter.eval("fg") == 3
+    assert inter.eval("jobs") == []
+
+    inter.eval("echo 1 2 &")
+    assert isinstance(inter.eval("wait")[0], ShellsyException)
+    assert len(done) == 2
+
+
+def test_failing_job_listener():
+    inter = Interp()
+    done = threading.Event()
+    inter.jobs.listeners += [lambda job: 1 / 0, lambda job: done.set()]
+    with pytest.warns(RuntimeWarning, match="ZeroDivisionError"):
+        inter.eval("echo 1 &")
+        assert done.wait(5)
+
+
+class Crunch(Shell):
+    @Command(cpu_bound=True)
+    def pid(shell):
+        return os.getpid()
+
+    @Command(cpu_bound=True)
+    def total(shell, stop: int):
+        return sum(range(stop))
+
+    @total.dispatch(cpu_bound=True)
+    def total_stream(shell, items: S_Stream):
+        return sum(items)
+
+    @total.dispatch
+    def total_text(shell, text: str):
+        return len(text)
+
+
+def test_cpu_bound_commands():
+    assert pickle.loads(pickle.dumps(Crunch.total)) is Crunch.total
+    dispatch = Crunch.total.dispatches[0]
+    assert pickle.loads(pickle.dumps(dispatch)) is dispatch
+    assert dispatch.cpu_bound
+    assert not Crunch.total.dispatches[1].cpu_bound
+
+    inter = Interp()
+    inter.shell.add_subshell("crunch", Crunch(inter.shell))
+    try:
+        assert inter.eval("crunch.pid") != os.getpid()
+        assert inter.eval("crunch.total 10") == 45
+        assert inter.eval("filter [1 2 3] * | crunch.total") == 6
+        assert inter.eval("crunch.total 'abc'") == 3
+        assert asyncio.run(inter.aeval("crunch.total 4")) == 6
+    finally:
+        shutdown_process_pool()
+
+
+class Vector(Shell):
+    calls = 0
+
+    @Command
+    def add(shell, a: int, b: int = 0):
+        Vector.calls += 1
+        return a + b
+
+    @Command
+    async def aadd(shell, a: int, b: int = 0):
+        return a + b
+
+
+def test_broadcast():
+    inter = Interp()
+    inter.shell.add_subshell("vector", Vector(inter.shell))
+    inter.context.scope["names"] = ["a", "b"]
+
+    assert inter.eval("echo @[1 [2] 'x']") == [1, [2], "x"]
+    assert inter.eval("echo @$names") == ["a", "b"]
+    assert inter.eval("echo @[]") == []
+    assert inter.eval("vector.add @[1 2 3] 10") == [11, 12, 13]
+    assert inter.eval("vector.add @@[1 2] -b @[3 4]") == [4, 6]
+    assert inter.eval("vector.aadd 1 -b @[1 2]") == [2, 3]
+    assert Vector.calls == 5
+    for line in (
+        "vector.add @[1 'x']",
+        "vector.add @[1 2] -b @[3]",
+        "echo @$nothing",
+    ):
+        with pytest.raises(ShellsyException):
+            inter.eval(line)
+
+
+def test_scope_view_follows_assignments():
+    root = S_Scope({"b": 1, "a": 2})
+    block = S_Scope({"c": 3}, parents=[root])
+    assert dict(block.resolved()) == {"a": 2, "b": 1, "c": 3}
+    assert block.names() == ["a", "b", "c"]
+    root["ab"] = 4
+    block["b"] = 5
+    assert block.names("a") == ["a", "ab"]
+    assert block.resolved()["b"] == 5 and root.resolved()["b"] == 1
+    del root["a"]
+    assert block.names("a") == ["ab"]
+    assert "a" not in block.resolved()
+
+
+def test_scope_owner_cache():
+    root = S_Scope({"x": 1})
+    block = S_Scope(parents=[S_Scope(parents=[root])], nonlocals=["x"])
+    assert block["x"] == 1 and block.owner("x") is root
+    assert block.get("y", 0) == 0
+    root["y"] = 2
+    assert block["y"] == 2
+    block.parents[0]["x"] = 3
+    assert block.owner("x") is block.parents[0]
+    assert block["x"] == 3 and root["x"] == 1
+    block["x"] = 4
+    assert block.nonlocals == {"x"}
+    assert block.parents[0]["x"] == 4
+    del block.parents[0]["x"]
+    assert block.owner("x") is block
+
+
+def test_scope_dict_methods():
+    root = S_Scope({"a": 1})
+    block = S_Scope(parents=[root])
+    assert block.get("z") is None and block.names("q") == []
+    root.update({"z": 5}, q=1)
+    assert block.get("z") == 5
+    assert "q" in block.resolved() and block.names("q") == ["q"]
+    assert root.setdefault("w", 2) == 2 and block["w"] == 2
+    assert root.pop("z") == 5 and block.get("z") is None
+    assert root.popitem() == ("w", 2) and "w" not in block.resolved()
+    root |= {"v": 3}
+    assert block["v"] == 3
+    root.clear()
+    assert block.get("a") is None and block.names() == []
+    for i in range(100):
+        block.get(f"missing{i}")
+    assert len(block._owners) == 0
+
+
+def test_scope_view_across_threads():
+    root = S_Scope()
+    block = S_Scope(parents=[root])
+    block.names()
+
+    def assign():
+        for i in range(20000):
+            root[f"v{i}"] = i
+
+    thread = threading.Thread(target=assign)
+    thread.start()
+    while thread.is_alive():
+        block.names("v1")
+    thread.join()
+    assert len(block.names("v")) == 20000
+    assert block.names("v", 3) == ["v0", "v1", "v10"]
+    assert block.resolved()["v19999"] == 19999
@@ -0,0 +1,57 @@
+import pytest
+
+from shellsy.exceptions import ShellsyException
+from shellsy.interpreter import S_Interpreter as Interp
+from shellsy.lang import _Parser
+from shellsy.lang import _Tokenizer
+
+
+def test_tokenize():
+    line = "12 -3.5 1:2 1,2 'a b' /p q/ $v -k [w] [-]"
+    assert [(t.type, t.text) for t in _Tokenizer.tokenize(line)] == [
+        ("number", "12"),
+        ("number", "-3.5"),
+        ("slice", "1:2"),
+        ("point", "1,2"),
+        ("string", "'a b'"),
+        ("path", "/p q/"),
+        ("variable", "$v"),
+        ("key", "-k"),
+        ("lbracket", "["),
+        ("word", "w"),
+        ("rbracket", "]"),
+        ("empty_dict", "[-]"),
+    ]
+    token = next(_Tokenizer.tokenize("echo   'x'", 4))
+    assert (token.begin, token.end) == (7, 10)
+
+
+def test_tokenize_errors():
+    with pytest.raises(_Parser.WrongLiteral):
+        list(_Tokenizer.tokenize("'abc"))
+    with pytest.raises(_Parser.WrongLiteral):
+        list(_Tokenizer.tokenize("1::2"))
+
+
+def error_of(line: str):
+    with pytest.raises(ShellsyException) as e:
+        Interp().eval(line)
+    stacks = e.value.stacktrace.stacks
+    return e.value.message, [(s.xpos, s.file) for s in stacks]
+
+
+def test_literal_errors():
+    assert error_of("echo 1::2") == (
+        "Unterminated slice field",
+        [((5, 9), "<argument>"), ((7, 9), "<literal>")],
+    )
+    assert error_of("echo [1 1::2]")[1][-1] == ((10, 13), "<literal>")
+    # the tokenizer points at the whole key, and names malformed numbers
+    assert error_of("echo -k") == (
+        "Extra keyword argument",
+        [((5, 7), "<literal>")],
+    )
+    assert error_of("echo 1.2.3") == (
+        "wrong number literal",
+        [((5, 10), "<argument>"), ((5, 10), "<literal>")],
+    )
@@ -0,0 +1,98 @@
+from io import StringIO
+
+from shellsy.interpreter import S_Interpreter as Interp
+from shellsy.shell import Command
+from shellsy.shell import Shell
+from shellsy.runner import S_Runner
+from shellsy.runner import S_Script
+from shellsy.runner import ScriptCache
+
+
+def test_run_script():
+    inter = Interp()
+    source = StringIO("# comment\necho 1\n\necho 'a\necho 2\n")
+    script = S_Script.compile(source, inter, "test.shellsy")
+    assert [line.lineno for line in script.lines] == [2, 4, 5]
+    assert script.lines[1].command is None
+
+    errors = StringIO()
+    assert S_Runner(inter, stderr=errors).run(script) == 1
+    assert "File test.shellsy, line 4" in errors.getvalue()
+
+    errors = StringIO()
+    assert S_Runner(inter, keep_going=True, stderr=errors).run(script) == 1
+
+
+def test_run_plain_exceptions():
+    class Failing(Shell):
+        @Command
+        def fail(shell):
+            raise ValueError("boom")
+
+    inter = Interp()
+    inter.shell.add_subshell("failing", Failing(inter.shell))
+    script = S_Script.compile(
+        StringIO("failing.fail\nnosuch.command\necho 1\n"), inter, "t"
+    )
+    errors = StringIO()
+    assert S_Runner(inter, stderr=errors).run(script) == 1
+    assert "ValueError: boom" in errors.getvalue()
+    assert "File t, line 1" in errors.getvalue()
+
+    errors = StringIO()
+    assert S_Runner(inter, keep_going=True, stderr=errors).run(script) == 2
+    assert "File t, line 2" in errors.getvalue()
+
+
+def test_script_cache(tmp_path):
+    script_file = tmp_path / "test.shellsy"
+    script_file.write_text("echo [1 $x]\necho 'a\n")
+    cache = ScriptCache(tmp_path / "cache")
+
+    inter = Interp()
+    S_Script.from_file(script_file, inter, cache)
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+    inter = Interp()
+    inter.context["x"] = 2
+    script = cache.load(cache.key(script_file.read_bytes(), inter), "f", inter)
+    assert script.lines[1].command is None
+    assert inter.evaluate(script.lines[0].command)[1]() == 2
+
+    cache.disk.max_bytes = 0
+    cache.disk.evict()
+    assert list((tmp_path / "cache").iterdir()) == []
+
+
+def test_script_cache_pipeline(tmp_path):
+    script_file = tmp_path / "test.shellsy"
+    script_file.write_text("echo [1 2] | json.dump\n")
+    cache = ScriptCache(tmp_path / "cache")
+    S_Script.from_file(script_file, Interp(), cache)
+
+    inter = Interp()
+    script = S_Script.from_file(script_file, inter, cache)
+    assert inter.evaluate(script.lines[0].command) == "[1, 2]"
+
+
+def test_script_cache_stale_pickle(tmp_path):
+    cache = ScriptCache(tmp_path / "cache")
+    inter = Interp()
+    for data in (b"cno_such_plugin\nThing\n.", b"cshellsy.lang\nS_Gone\n."):
+        cache.disk.set("key", data)
+        assert cache.load("key", "f", inter) is None
+        assert cache.disk.get("key") is None
+
+
+def test_script_cache_background(tmp_path):
+    script_file = tmp_path / "test.shellsy"
+    script_file.write_text("echo 1 &\necho 2\n")
+    cache = ScriptCache(tmp_path / "cache")
+    S_Runner(Interp(), cache=cache).run_file(script_file)
+
+    inter = Interp()
+    script = cache.load(cache.key(script_file.read_bytes(), inter), "f", inter)
+    assert script is not None
+    assert script.lines[0].command.jobs is inter.jobs
+    assert S_Runner(inter, cache=cache).run_file(script_file) == 0
+    assert inter.jobs.wait() == [1]
@@ -0,0 +1,17 @@
+import json
+import os
+
+from shellsy.settings import SettingsFile
+
+
+def test_settings_reload(tmp_path):
+    path = tmp_path / "settings.json"
+    settings = SettingsFile(str(path), {"a": 1})
+    settings["a"] = 2
+    settings.load()
+    assert settings["a"] == 2
+
+    path.write_text(json.dumps({"a": 3}))
+    os.utime(path, ns=(1, 1))
+    settings.load()
+    assert settings["a"] == 3
@@ -0,0 +1,235 @@
+import pytest
+
+from shellsy.exceptions import ArgumentError
+from shellsy.exceptions import NoSuchCommand
+from shellsy.exceptions import ShellsyException
+from shellsy.interpreter import S_Interpreter as Interp
+from shellsy.lang import S_Stream
+from shellsy.lang import S_Variable
+from shellsy.lang import S_Word
+from shellsy.shell import Command
+from shellsy.shell import LazyShell
+from shellsy.shell import CommandParameters
+from shellsy.shell import S_Arguments
+from shellsy.shell import Shell
+
+
+def command(shell, a: int, b: str = "b", *, c: list = None):
+    pass
+
+
+def piped(shell, items: S_Stream, a: int = 0):
+    pass
+
+
+def arguments(*args, **kwargs):
+    return S_Arguments(
+        [(val, (0, repr(val))) for val in args],
+        {(key, 0): (val, (0, repr(val))) for key, val in kwargs.items()},
+        "",
+    )
+
+
+def test_bind():
+    params = CommandParameters.from_function(command)
+
+    assert params.bind(arguments(1)) == {"a": 1}
+    bound = params.bind(arguments(1, "x", c=[2]))
+    assert bound == {"a": 1, "b": "x", "c": [2]}
+    assert params.bind(arguments(b="x", a=1)) == {"a": 1, "b": "x"}
+    for args in (
+        arguments(),
+        arguments("1"),
+        arguments(1, "x", [], 4),
+        arguments(1, a=2),
+        arguments(1, d=2),
+    ):
+        with pytest.raises(ArgumentError):
+            params.bind(args)
+    with pytest.raises(ArgumentError):
+        params.bind(arguments(1), stream=[])
+
+
+def test_bind_stream():
+    params = CommandParameters.from_function(piped)
+
+    assert params.stream.name == "items"
+    assert params.bind(arguments(2), stream="s") == {"items": "s", "a": 2}
+
+
+class Overloads(Shell):
+    @Command
+    def pick(shell, a: int):
+        return "int"
+
+    @pick.dispatch
+    def pick_str(shell, a: str):
+        return "str"
+
+    @pick.dispatch
+    def pick_as(shell, a: str, _: S_Word["as"], b: str):
+        return "as"
+
+    @pick.dispatch
+    def pick_to(shell, a: str, _: S_Word["to"], b: str):
+        return "to"
+
+    @pick.dispatch
+    def pick_key(shell, *, key: list):
+        return "key"
+
+
+def test_dispatch_index():
+    index = Overloads.pick.dispatch_index
+    inter = Interp()
+    inter.shell.add_subshell("overloads", Overloads(inter.shell))
+
+    assert inter.eval("overloads.pick 1") == "int"
+    assert inter.eval("overloads.pick a") == "str"
+    assert inter.eval("overloads.pick a to b") == "to"
+    assert inter.eval("overloads.pick a as b") == "as"
+    assert inter.eval("overloads.pick -key [1]") == "key"
+    assert [cmd.name for cmd in index.candidates(arguments(S_Word("a")))] == [
+        "pick_str"
+    ]
+    with pytest.raises(NoSuchCommand):
+        inter.eval("overloads.pick a from b")
+
+
+def test_command_paths():
+    inter = Interp()
+    root = inter.shell
+    generation = root.generation
+
+    shell = root.add_subshell("overloads", Overloads(root))
+    assert root.generation == generation + 1
+    assert shell.path == "overloads"
+    assert root.command_paths["overloads.pick"] is shell.commands["pick"]
+    assert shell.commands["pick"].__func__ is Overloads.pick.__func__
+    assert "overloads.pick" in root.get_possible_subcommands()
+    entry = root.get_command("bookmark")
+    assert entry.shell is root.subshells["bookmark"]
+    assert root.command_paths["bookmark.__entrypoint__"] is entry
+    with pytest.raises(NoSuchCommand):
+        root.get_command("overloads.nothing")
+
+
+def test_shell_registry():
+    assert set(Overloads._commands) == {"pick"}
+    first, second = Interp().shell, Interp().shell
+
+    first.add_subshell("overloads", Overloads(first))
+    assert "overloads" not in second.subshells
+    assert first.subshells["bookmark"] is not second.subshells["bookmark"]
+    assert Overloads.pick.shell is None
+
+
+def test_interpreters_keep_their_shells():
+    first, second = Interp(), Interp()
+    assert first.eval("jobs") == []
+    second.eval("echo 2 &")
+    assert len(second.eval("jobs")) == 1
+    assert first.eval("jobs") == []
+    second.jobs.wait()
+
+
+class Costly(Shell):
+    created = 0
+
+    def __init__(self, parent):
+        Costly.created += 1
+        super().__init__(parent)
+
+    @Command
+    def run(shell):
+        return shell
+
+    class inner(Shell):
+        @Command
+        def run(shell):
+            return shell
+
+
+def test_lazy_subshells():
+    root = Interp().shell
+    root.add_subshell("costly", LazyShell(Costly, root, "costly"))
+
+    assert "costly.inner.run" in root.get_possible_subcommands()
+    assert Costly.created == 0
+    inner = root.get_command("costly.inner.run")
+    assert Costly.created == 1
+    assert isinstance(root.subshells["costly"], Costly)
+    assert inner(arguments()).path == "costly.inner"
+    costly = root.get_command("costly.run")(arguments())
+    assert costly is root.subshells["costly"]
+    assert Costly.created == 1
+
+
+def test_lazy_help(monkeypatch):
+    cmd = Command(command)
+    assert cmd._help is None
+    assert cmd.params.plan.names == ("a", "b", "c")
+
+    doc = "Does it\n:param a: The a\n:returns: nothing"
+    monkeypatch.setattr(command, "__doc__", doc)
+    assert cmd.help.help == "Does it"
+    assert cmd.help.return_help == "nothing"
+    assert [p.name for p in cmd.help.param_help] == ["a"]
+    assert cmd.help is cmd.help
+
+
+class Memo(Shell):
+    calls = 0
+
+    @Command(cache=2)
+    def double(shell, val: list):
+        Memo.calls += 1
+        return val * 2
+
+    @double.dispatch
+    def double_int(shell, val: int):
+        Memo.calls += 1
+        return val * 2
+
+    @Command(cache=4)
+    async def adouble(shell, val: int):
+        Memo.calls += 1
+        return val * 2
+
+    @Command(cache=4)
+    def show(shell, val):
+        return val() if isinstance(val, S_Variable) else val
+
+    @Command(cache=4)
+    def letters(shell, word: str):
+        return set(word)
+
+
+def test_command_cache():
+    inter = Interp()
+    inter.shell.add_subshell("memo", Memo(inter.shell))
+    Memo.double.cache.clear()
+
+    assert inter.eval("memo.double [1 [2]]") == [1, [2], 1, [2]]
+    assert inter.eval("memo.double [1 [2]]") == [1, [2], 1, [2]]
+    assert inter.eval("memo.double 2") == 4
+    assert inter.eval("memo.double 2") == 4
+    assert inter.eval("memo.adouble 3") == 6
+    assert inter.eval("memo.adouble 3") == 6
+    assert Memo.calls == 3
+    assert inter.eval("cache.stats")["memo.double"]["hits"] == 2
+
+    inter.eval("cache.clear memo.double")
+    assert inter.eval("cache.stats")["memo.double"]["size"] == 0
+    assert inter.eval("memo.double 2") == 4
+    assert Memo.calls == 4
+    with pytest.raises(ShellsyException):
+        inter.eval("cache.clear memo.nothing")
+
+    inter.context["x"] = 1
+    assert inter.eval("memo.show $x") == 1
+    inter.context["x"] = 2
+    assert inter.eval("memo.show $x") == 2
+
+    inter.eval("memo.letters ab").add("c")
+    assert inter.eval("memo.letters ab") == {"a", "b"}
@@ -0,0 +1,38 @@
+from decimal import Decimal
+from pathlib import Path
+
+from pyoload import type_match
+
+from shellsy.lang import Nil
+from shellsy.lang import S_Literal
+from shellsy.lang import S_Word
+from shellsy.validators import compile_validator
+from shellsy.validators import validate
+
+VALUES = (1, True, "a", S_Word("as"), Path("."), Decimal(1), None, Nil, [1, 2])
+SPECS = (
+    int,
+    str | Path,
+    S_Literal,
+    S_Word["as"],
+    Nil,
+    list[int],
+    dict[str, int],
+    int | list[str],
+)
+
+
+def test_validators_match_pyoload():
+    for spec in SPECS:
+        for val in VALUES:
+            assert validate(val, spec) == type_match(val, spec)[0], (val, spec)
+
+
+def test_validators_containers():
+    check = compile_validator(list[int | str])
+
+    assert compile_validator(list[int | str]) is check
+    assert check(list(range(1000)) + ["a"])
+    assert not check([1, 2, 3.0])
+    assert validate({"a": [1]}, dict[str, list[int]])
+    assert not validate({"a": ["b"]}, dict[str, list[int]])